@@ -6,6 +6,7 @@ from sqlalchemy import engine_from_config, pool
 from sqlalchemy.ext.asyncio import AsyncEngine
 
 from src.adapters.database.models.groups import Group
+from src.adapters.database.models.images import Image
 from src.adapters.database.models.users import User, Base
 from src.core import settings
 
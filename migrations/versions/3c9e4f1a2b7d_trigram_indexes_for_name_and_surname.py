@@ -0,0 +1,42 @@
+"""Trigram indexes for name and surname
+
+Revision ID: 3c9e4f1a2b7d
+Revises: 512197aef736
+Create Date: 2026-10-18 12:04:31.218443
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3c9e4f1a2b7d"
+down_revision: Union[str, None] = "512197aef736"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # btree_gin provides the GIN operator class for the uuid group_id column
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    op.create_index(
+        "ix_users_group_id_name_trgm",
+        "users",
+        ["group_id", "name"],
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_users_group_id_surname_trgm",
+        "users",
+        ["group_id", "surname"],
+        postgresql_using="gin",
+        postgresql_ops={"surname": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_group_id_surname_trgm", table_name="users")
+    op.drop_index("ix_users_group_id_name_trgm", table_name="users")
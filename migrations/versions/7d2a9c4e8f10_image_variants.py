@@ -0,0 +1,32 @@
+"""Image variants
+
+Revision ID: 7d2a9c4e8f10
+Revises: 3c9e4f1a2b7d
+Create Date: 2026-10-18 17:41:09.512734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7d2a9c4e8f10"
+down_revision: Union[str, None] = "3c9e4f1a2b7d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column(
+            "image_variants", postgresql.JSONB(astext_type=sa.Text()), nullable=True
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "image_variants")
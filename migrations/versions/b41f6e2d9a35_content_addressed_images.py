@@ -0,0 +1,32 @@
+"""Content addressed images
+
+Revision ID: b41f6e2d9a35
+Revises: 7d2a9c4e8f10
+Create Date: 2026-10-18 17:58:42.107391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b41f6e2d9a35"
+down_revision: Union[str, None] = "7d2a9c4e8f10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "images",
+        sa.Column("hash", sa.String(length=64), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("hash"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("images")
@@ -0,0 +1,37 @@
+"""Keyset pagination indexes
+
+Revision ID: e5a8c3f71b26
+Revises: b41f6e2d9a35
+Create Date: 2026-10-18 18:04:12.503816
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a8c3f71b26"
+down_revision: Union[str, None] = "b41f6e2d9a35"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+KEYSET_COLUMNS = (
+    "name",
+    "surname",
+    "created_at",
+    "modified_at",
+    "role",
+    "is_blocked",
+    "group_id",
+)
+
+
+def upgrade() -> None:
+    for column in KEYSET_COLUMNS:
+        op.create_index(f"ix_users_{column}_id", "users", [column, "id"])
+
+
+def downgrade() -> None:
+    for column in reversed(KEYSET_COLUMNS):
+        op.drop_index(f"ix_users_{column}_id", table_name="users")
@@ -0,0 +1,29 @@
+"""Image pending deletion
+
+Revision ID: f2b7d94c1e58
+Revises: e5a8c3f71b26
+Create Date: 2026-10-18 18:21:37.640215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2b7d94c1e58"
+down_revision: Union[str, None] = "e5a8c3f71b26"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "images",
+        sa.Column("deleting", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("images", "deleting")
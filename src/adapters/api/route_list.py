@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from src.adapters.api.routes import auth, healthcheck, user, group
+from src.adapters.api.routes import auth, healthcheck, user, group, metrics
 from src.app import app
 
 app.include_router(healthcheck.router, tags=["Healthcheck"])
@@ -9,5 +9,6 @@ v1_router = APIRouter(prefix="/v1")
 v1_router.include_router(user.router)
 v1_router.include_router(auth.router)
 v1_router.include_router(group.router)
+v1_router.include_router(metrics.router, tags=["Metrics"])
 
 app.include_router(v1_router)
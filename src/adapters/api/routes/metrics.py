@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+
+from src.core.permissions import (
+    check_curr_user_for_block_status,
+    check_current_user_for_admin,
+)
+from src.core.services.metrics import collect_metrics
+
+router = APIRouter()
+
+
+@router.get(
+    "/metrics",
+    dependencies=[
+        Depends(check_current_user_for_admin),
+        Depends(check_curr_user_for_block_status),
+    ],
+)
+async def get_metrics():
+    return collect_metrics()
@@ -1,15 +1,16 @@
-from fastapi import APIRouter, Depends, Query, Security, UploadFile, File
+from fastapi import APIRouter, Depends, Query, UploadFile, File
+from fastapi.responses import StreamingResponse
 from typing import List, Annotated
 
-from fastapi.security import HTTPAuthorizationCredentials
 from pydantic import UUID4
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core import security
-from src.core.services.token import get_token_payload
+from src.core.services.token import get_current_token_payload
+from src.ports.enums import UsersFileFormat
 from src.core.services.user import (
     get_current_user_from_token,
 )
+from src.core.services.file_service import create_image_upload
 from src.core.permissions import (
     check_curr_user_for_block_status,
     check_current_user_for_admin,
@@ -20,6 +21,16 @@ from src.ports.schemas.user import (
     UserUpdateRequestModelWithoutImage,
     UserUpdateMeRequestModel,
     UserUpdateModelWithoutImage,
+    TokenDataWithTokenType,
+    UsersCursorPageModel,
+    UsersImportResultModel,
+    UsersBulkUpdateModel,
+    UsersBulkUpdateResultModel,
+    UsersBatchLookupModel,
+    UsersBatchLookupResultModel,
+    ImageUploadRequestModel,
+    ImageUploadModel,
+    ImageUploadConfirmModel,
 )
 from src.adapters.database.database_settings import get_async_session
 from src.core.actions.user import (
@@ -27,6 +38,12 @@ from src.core.actions.user import (
     get_db_user_by_id,
     delete_db_user,
     get_users_for_admin_and_moderator,
+    get_users_page_for_admin_and_moderator,
+    export_users,
+    import_users,
+    bulk_update_db_users,
+    get_users_batch_for_admin_and_moderator,
+    confirm_image_upload,
 )
 
 router = APIRouter()
@@ -44,7 +61,7 @@ async def get_users(
     filter_by_surname: str = None,
     sort_by: str = None,
     order_by: str = Query("asc", pattern="^(asc|desc)$"),
-    token: HTTPAuthorizationCredentials = Security(security),
+    token_payload: TokenDataWithTokenType = Depends(get_current_token_payload),
     db_session: AsyncSession = Depends(get_async_session),
 ):
     return await get_users_for_admin_and_moderator(
@@ -55,10 +72,119 @@ async def get_users(
         sort_by=sort_by,
         order_by=order_by,
         db_session=db_session,
-        token=token.credentials,
+        token_payload=token_payload,
     )
 
 
+@router.get(
+    "/users/cursor",
+    response_model=UsersCursorPageModel,
+    dependencies=[Depends(check_curr_user_for_block_status)],
+)
+async def get_users_page(
+    cursor: str = None,
+    limit: int = Query(30, ge=1, le=100),
+    filter_by_name: str = None,
+    filter_by_surname: str = None,
+    sort_by: str = None,
+    order_by: str = Query("asc", pattern="^(asc|desc)$"),
+    token_payload: TokenDataWithTokenType = Depends(get_current_token_payload),
+    db_session: AsyncSession = Depends(get_async_session),
+):
+    return await get_users_page_for_admin_and_moderator(
+        cursor=cursor,
+        limit=limit,
+        filter_by_name=filter_by_name,
+        filter_by_surname=filter_by_surname,
+        sort_by=sort_by,
+        order_by=order_by,
+        db_session=db_session,
+        token_payload=token_payload,
+    )
+
+
+@router.get(
+    "/users/export",
+    response_class=StreamingResponse,
+    dependencies=[
+        Depends(check_current_user_for_admin),
+        Depends(check_curr_user_for_block_status),
+    ],
+)
+async def export_users_stream(
+    export_format: UsersFileFormat = Query(UsersFileFormat.NDJSON, alias="format"),
+    filter_by_name: str = None,
+    filter_by_surname: str = None,
+    sort_by: str = None,
+    order_by: str = Query("asc", pattern="^(asc|desc)$"),
+    db_session: AsyncSession = Depends(get_async_session),
+):
+    media_types = {
+        UsersFileFormat.NDJSON: "application/x-ndjson",
+        UsersFileFormat.CSV: "text/csv",
+    }
+
+    return StreamingResponse(
+        export_users(
+            export_format,
+            db_session,
+            filter_by_name=filter_by_name,
+            filter_by_surname=filter_by_surname,
+            sort_by=sort_by,
+            order_by=order_by,
+        ),
+        media_type=media_types[export_format],
+        headers={"Content-Disposition": f"attachment; filename=users.{export_format}"},
+    )
+
+
+@router.post(
+    "/users/batch",
+    response_model=UsersBatchLookupResultModel,
+    dependencies=[Depends(check_curr_user_for_block_status)],
+)
+async def get_users_batch(
+    batch_lookup: UsersBatchLookupModel,
+    token_payload: TokenDataWithTokenType = Depends(get_current_token_payload),
+    db_session: AsyncSession = Depends(get_async_session),
+):
+    return await get_users_batch_for_admin_and_moderator(
+        batch_lookup, token_payload, db_session
+    )
+
+
+@router.post(
+    "/users/import",
+    response_model=UsersImportResultModel,
+    dependencies=[
+        Depends(check_current_user_for_admin),
+        Depends(check_curr_user_for_block_status),
+    ],
+)
+async def import_users_file(
+    file: Annotated[UploadFile, File()],
+    file_format: UsersFileFormat = Query(UsersFileFormat.NDJSON, alias="format"),
+    db_session: AsyncSession = Depends(get_async_session),
+):
+    return await import_users(file, file_format, db_session)
+
+
+@router.patch(
+    "/users/bulk",
+    response_model=UsersBulkUpdateResultModel,
+    response_model_exclude_none=True,
+    dependencies=[
+        Depends(check_current_user_for_admin),
+        Depends(check_curr_user_for_block_status),
+    ],
+)
+async def bulk_update_users(
+    bulk_update: UsersBulkUpdateModel,
+    db_session: AsyncSession = Depends(get_async_session),
+):
+    return await bulk_update_db_users(bulk_update, db_session)
+
+
 @router.get(
     "/user/me",
     response_model=UserResponseModel,
@@ -78,10 +204,10 @@ async def get_me(
 async def update_me(
     update_data: UserUpdateMeRequestModel = Depends(),
     image_file: Annotated[UploadFile, File()] = None,
-    token: HTTPAuthorizationCredentials = Security(security),
+    token_payload: TokenDataWithTokenType = Depends(get_current_token_payload),
     db_session: AsyncSession = Depends(get_async_session),
 ):
-    user_id = get_token_payload(token.credentials).user_id
+    user_id = token_payload.user_id
 
     return await get_updated_db_user(
         update_data=UserUpdateModelWithoutImage(**update_data.__dict__),
@@ -91,16 +217,43 @@ async def update_me(
     )
 
 
+@router.post(
+    "/user/me/image/upload",
+    response_model=ImageUploadModel,
+    dependencies=[Depends(check_curr_user_for_block_status)],
+)
+async def create_my_image_upload(
+    upload_request: ImageUploadRequestModel,
+    token_payload: TokenDataWithTokenType = Depends(get_current_token_payload),
+):
+    return await create_image_upload(token_payload.user_id, upload_request.content_type)
+
+
+@router.post(
+    "/user/me/image/confirm",
+    response_model=UserResponseModel,
+    dependencies=[Depends(check_curr_user_for_block_status)],
+)
+async def confirm_my_image_upload(
+    upload_confirm: ImageUploadConfirmModel,
+    token_payload: TokenDataWithTokenType = Depends(get_current_token_payload),
+    db_session: AsyncSession = Depends(get_async_session),
+):
+    return await confirm_image_upload(
+        token_payload.user_id, upload_confirm.key, db_session
+    )
+
+
 @router.delete(
     "/user/me",
     response_model=UUID4,
     dependencies=[Depends(check_curr_user_for_block_status)],
 )
 async def delete_me(
-    token: HTTPAuthorizationCredentials = Security(security),
+    token_payload: TokenDataWithTokenType = Depends(get_current_token_payload),
     db_session: AsyncSession = Depends(get_async_session),
 ):
-    user_id = get_token_payload(token.credentials).user_id
+    user_id = token_payload.user_id
 
     return await delete_db_user(user_id, db_session)
 
@@ -112,11 +265,11 @@ async def delete_me(
 )
 async def get_user(
     user_id: UUID4,
-    token: HTTPAuthorizationCredentials = Security(security),
+    token_payload: TokenDataWithTokenType = Depends(get_current_token_payload),
     db_session: AsyncSession = Depends(get_async_session),
 ):
     user = await get_db_user_by_id(user_id, db_session)
-    await check_current_user_for_moderator_and_admin(user.group_id, token.credentials)
+    await check_current_user_for_moderator_and_admin(user.group_id, token_payload)
 
     return user
 
@@ -1,17 +1,48 @@
 from src.ports.repositories.aws_repository import AwsAbstractRepository
-from src.core.services.s3_service import aws_client
+from src.core.services.s3_service import s3_client
 from src.core import settings
 
 
 class AwsRepository(AwsAbstractRepository):
-    async def add_one(self, body: bytes, key: str):
-        async with aws_client("s3") as s3:
-            await s3.put_object(Body=body, Bucket=settings.s3_bucket_name, Key=key)
+    async def add_one(
+        self, body: bytes, key: str, content_type: str = "binary/octet-stream"
+    ):
+        s3 = await s3_client.get_client()
+        await s3.put_object(
+            Body=body,
+            Bucket=settings.s3_bucket_name,
+            Key=key,
+            ContentType=content_type,
+        )
 
     async def delete(self, key: str):
-        async with aws_client("s3") as s3:
-            await s3.delete_object(Bucket=settings.s3_bucket_name, Key=key)
+        s3 = await s3_client.get_client()
+        await s3.delete_object(Bucket=settings.s3_bucket_name, Key=key)
 
-    async def get(self, key: str):
-        async with aws_client("s3") as s3:
+    async def get(self, key: str, byte_range: str | None = None):
+        s3 = await s3_client.get_client()
+        if byte_range is None:
             return await s3.get_object(Bucket=settings.s3_bucket_name, Key=key)
+        return await s3.get_object(
+            Bucket=settings.s3_bucket_name, Key=key, Range=byte_range
+        )
+
+    async def head(self, key: str):
+        s3 = await s3_client.get_client()
+        return await s3.head_object(Bucket=settings.s3_bucket_name, Key=key)
+
+    async def generate_presigned_post(
+        self, key: str, content_type: str, max_size: int, expires_in: int
+    ) -> dict:
+        s3 = await s3_client.get_client()
+        # S3 itself rejects uploads outside these conditions
+        return await s3.generate_presigned_post(
+            Bucket=settings.s3_bucket_name,
+            Key=key,
+            Fields={"Content-Type": content_type},
+            Conditions=[
+                {"Content-Type": content_type},
+                ["content-length-range", 1, max_size],
+            ],
+            ExpiresIn=expires_in,
+        )
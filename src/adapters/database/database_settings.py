@@ -1,16 +1,82 @@
+import random
+
+from sqlalchemy import Delete, Insert, Update
 from sqlalchemy.engine import URL
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session
 from typing import AsyncGenerator
 
+from src.adapters.database.pool import InstrumentedQueuePool
 from src.logging_config import logger
 from src.core import settings
+from src.core.services.metrics import register_collector
+
+STICK_TO_PRIMARY = "stick_to_primary"
+
+
+def create_pooled_engine(db_creds: dict) -> AsyncEngine:
+    server_settings = {}
+    if settings.db_statement_timeout_ms is not None:
+        server_settings["statement_timeout"] = str(settings.db_statement_timeout_ms)
+
+    return create_async_engine(
+        URL.create(**db_creds),
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args={
+            "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+            "server_settings": server_settings,
+        },
+    )
+
+
+async_engine = create_pooled_engine(settings.get_db_creds)
+
+replica_engines = [
+    create_pooled_engine(replica_creds)
+    for replica_creds in settings.get_db_replica_creds
+]
+
+
+class RoutingSession(Session):
+    """Sends statements marked with ``use_replica`` to a read replica.
+
+    Once the session has flushed or executed a DML statement every later
+    statement goes to the primary, so a request always reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            self.info[STICK_TO_PRIMARY] = True
+        elif (
+            replica_engines
+            and not self.info.get(STICK_TO_PRIMARY)
+            and clause is not None
+            and clause.get_execution_options().get("use_replica")
+        ):
+            return random.choice(replica_engines).sync_engine
+
+        return async_engine.sync_engine
+
+
+async_session = async_sessionmaker(
+    bind=async_engine, sync_session_class=RoutingSession, expire_on_commit=False
+)
+
 
-database_url = URL.create(**settings.get_db_creds)
+def get_pool_metrics() -> dict:
+    return {
+        "primary": async_engine.pool.get_metrics(),
+        "replicas": [engine.pool.get_metrics() for engine in replica_engines],
+    }
 
-async_engine = create_async_engine(database_url)
 
-async_session = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+register_collector("db_pool", get_pool_metrics)
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
@@ -0,0 +1,122 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Union
+
+from pydantic import UUID4
+from redis.exceptions import RedisError
+
+from src.adapters.database.redis_connection import redis_connection
+from src.core import settings
+from src.core.services.metrics import register_collector
+from src.logging_config import logger
+from src.ports.schemas.group import GroupResponseModel
+
+GROUP_INVALIDATION_CHANNEL = "groups:invalidate"
+
+
+class GroupCache:
+    def __init__(
+        self, enabled: bool, max_size: int, ttl_seconds: int, pubsub_enabled: bool
+    ):
+        self.enabled = enabled
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.pubsub_enabled = pubsub_enabled
+        self._entries: OrderedDict[
+            str, tuple[float, GroupResponseModel]
+        ] = OrderedDict()
+        self._listener: asyncio.Task | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, group_id: UUID4) -> Union[GroupResponseModel, None]:
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(str(group_id))
+        if entry is None or entry[0] < time.monotonic():
+            self._entries.pop(str(group_id), None)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(str(group_id))
+        self.hits += 1
+        return entry[1]
+
+    def set(self, group: GroupResponseModel):
+        if not self.enabled:
+            return
+
+        self._entries[str(group.id)] = (time.monotonic() + self.ttl_seconds, group)
+        self._entries.move_to_end(str(group.id))
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def invalidate(self, group_id: UUID4):
+        self._entries.pop(str(group_id), None)
+
+        if not self.enabled or not self.pubsub_enabled:
+            return
+
+        try:
+            await redis_connection.client.publish(
+                GROUP_INVALIDATION_CHANNEL, str(group_id)
+            )
+        except RedisError as err:
+            logger.error(f"Group cache invalidation publish failed: {err}.")
+
+    def start(self):
+        if self.enabled and self.pubsub_enabled and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen(self):
+        while True:
+            pubsub = redis_connection.client.pubsub()
+            try:
+                await pubsub.subscribe(GROUP_INVALIDATION_CHANNEL)
+                logger.info("Subscribed to group cache invalidations.")
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=1.0
+                    )
+                    if message is not None:
+                        self._entries.pop(message["data"].decode(), None)
+            except RedisError as err:
+                # invalidations may have been missed while disconnected
+                self._entries.clear()
+                logger.error(f"Group cache subscription failed: {err}.")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def get_metrics(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+group_cache = GroupCache(
+    enabled=settings.group_cache_enabled,
+    max_size=settings.group_cache_max_size,
+    ttl_seconds=settings.group_cache_ttl_seconds,
+    pubsub_enabled=settings.group_cache_pubsub_enabled,
+)
+
+register_collector("group_cache", group_cache.get_metrics)
@@ -0,0 +1,13 @@
+from sqlalchemy import Boolean, DateTime, Integer, String, func
+from sqlalchemy.orm import mapped_column
+
+from src.adapters.database.models.users import Base
+
+
+class Image(Base):
+    __tablename__ = "images"
+
+    hash = mapped_column(String(64), primary_key=True)
+    ref_count = mapped_column(Integer, nullable=False, default=0)
+    deleting = mapped_column(Boolean, nullable=False, default=False)
+    created_at = mapped_column(DateTime, nullable=False, default=func.now())
@@ -4,10 +4,12 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     String,
     func,
     text,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import mapped_column, relationship, DeclarativeBase
 from src.ports.enums import Role
 
@@ -39,6 +41,7 @@ class User(Base):
         UUID, ForeignKey("groups.id", ondelete="RESTRICT"), nullable=False
     )
     image = mapped_column(String, nullable=True)
+    image_variants = mapped_column(JSONB, nullable=True)
     is_blocked = mapped_column(Boolean, nullable=False, default=False)
     created_at = mapped_column(DateTime, nullable=False, default=func.now())
     modified_at = mapped_column(
@@ -46,3 +49,33 @@ class User(Base):
     )
 
     group = relationship("Group", back_populates="users", lazy="joined", uselist=False)
+
+
+# multicolumn GIN indexes also serve name/surname filters without group_id
+Index(
+    "ix_users_group_id_name_trgm",
+    User.group_id,
+    User.name,
+    postgresql_using="gin",
+    postgresql_ops={"name": "gin_trgm_ops"},
+)
+Index(
+    "ix_users_group_id_surname_trgm",
+    User.group_id,
+    User.surname,
+    postgresql_using="gin",
+    postgresql_ops={"surname": "gin_trgm_ops"},
+)
+
+# keyset pagination seeks on (sort column, id); username, email and
+# phone_number are unique, so their own indexes already give that order
+for column in (
+    User.name,
+    User.surname,
+    User.created_at,
+    User.modified_at,
+    User.role,
+    User.is_blocked,
+    User.group_id,
+):
+    Index(f"ix_users_{column.key}_id", column, User.id)
@@ -0,0 +1,106 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Union
+
+from fastapi import HTTPException, status
+from sqlalchemy import Boolean, DateTime, Enum, Uuid, and_, asc, desc, true, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+from src.logging_config import logger
+
+
+def encode_cursor(sort_by: Union[str, None], order_by: str, value: Any, id) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif isinstance(value, uuid.UUID):
+        value = str(value)
+
+    data = {"sort_by": sort_by, "order_by": order_by, "value": value, "id": str(id)}
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+
+def decode_cursor_value(value: Any, column: Union[InstrumentedAttribute, None]) -> Any:
+    # a tampered cursor must not reach the query with a value of the wrong type
+    if value is None:
+        return value
+    if column is None:
+        raise ValueError("cursor has a value but no sort column")
+
+    column_type = column.type
+    if isinstance(column_type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column_type, Uuid):
+        return uuid.UUID(value)
+    if isinstance(column_type, Boolean):
+        if not isinstance(value, bool):
+            raise ValueError(f"{value!r} is not a boolean")
+        return value
+    if not isinstance(value, str):
+        raise ValueError(f"{value!r} is not a string")
+    if isinstance(column_type, Enum):
+        # cursors carry the enum value, the column stores the member name
+        if column_type.enum_class is not None:
+            return column_type.enum_class(value)
+        if value not in column_type.enums:
+            raise ValueError(f"{value!r} is not one of {column_type.enums}")
+    return value
+
+
+def decode_cursor(
+    cursor: str,
+    sort_by: Union[str, None],
+    order_by: str,
+    column: Union[InstrumentedAttribute, None],
+) -> tuple[Any, str]:
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(cursor + padding))
+
+        if data["sort_by"] != sort_by or data["order_by"] != order_by:
+            raise ValueError("cursor was issued for a different sort order")
+
+        return decode_cursor_value(data["value"], column), str(uuid.UUID(data["id"]))
+    except (ValueError, KeyError, TypeError, AttributeError) as err:
+        logger.error(f"Invalid cursor {cursor}: {err}.")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor."
+        )
+
+
+def keyset_seeks(
+    column: Union[InstrumentedAttribute, None],
+    id_column: InstrumentedAttribute,
+    order_by: str,
+    value: Any = None,
+    last_id: Union[str, None] = None,
+) -> list[tuple]:
+    # each seek is a (condition, ordering) pair that an index on (column, id)
+    # can serve; pages are filled from the seeks in turn
+    direction = asc if order_by == "asc" else desc
+
+    def after(left, right):
+        return left > right if order_by == "asc" else left < right
+
+    if column is None:
+        condition = true() if last_id is None else after(id_column, last_id)
+        return [(condition, [direction(id_column)])]
+
+    # NULLs are sorted last in both directions
+    null_ordering = [direction(id_column)]
+    if last_id is not None and value is None:
+        return [(and_(column.is_(None), after(id_column, last_id)), null_ordering)]
+
+    if last_id is None:
+        condition = column.is_not(None)
+    else:
+        condition = after(
+            tuple_(column, id_column),
+            tuple_(value, last_id, types=[column.type, id_column.type]),
+        )
+    seeks = [(condition, [direction(column), direction(id_column)])]
+
+    if column.nullable:
+        seeks.append((column.is_(None), null_ordering))
+    return seeks
@@ -0,0 +1,64 @@
+import time
+
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.core.services.metrics import Histogram
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waiting = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.checkout_time = Histogram()
+        self.hold_time = Histogram()
+        self._checked_out_at = {}
+
+    def _must_wait(self) -> bool:
+        # no idle connection and no room to open an overflow one
+        return (
+            self.checkedin() == 0
+            and self._max_overflow > -1
+            and self.overflow() >= self._max_overflow
+        )
+
+    def _do_get(self):
+        must_wait = self._must_wait()
+        if must_wait:
+            self.waiting += 1
+            self.waits += 1
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            if must_wait:
+                self.waiting -= 1
+            self.checkout_time.observe(time.perf_counter() - start)
+
+        self._checked_out_at[record] = time.perf_counter()
+        return record
+
+    def _do_return_conn(self, record):
+        checked_out_at = self._checked_out_at.pop(record, None)
+        if checked_out_at is not None:
+            self.hold_time.observe(time.perf_counter() - checked_out_at)
+
+        super()._do_return_conn(record)
+
+    def get_metrics(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": self.overflow(),
+            "waiting": self.waiting,
+            "waits": self.waits,
+            "timeouts": self.timeouts,
+            "checkout_time_seconds": self.checkout_time.snapshot(),
+            "hold_time_seconds": self.hold_time.snapshot(),
+        }
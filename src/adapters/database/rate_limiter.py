@@ -0,0 +1,51 @@
+from redis.exceptions import RedisError
+
+from src.adapters.database.redis_connection import redis_connection
+from src.core import settings
+from src.core.services.metrics import register_collector
+from src.logging_config import logger
+
+
+class RateLimiter:
+    def __init__(self, name: str, limit: int, window_seconds: int):
+        self.name = name
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.rejected = 0
+        self.errors = 0
+
+    async def allow(self, key: str) -> bool:
+        # fixed window: the first hit creates the counter with its expiry
+        redis_key = f"rate:{self.name}:{key}"
+        try:
+            async with redis_connection.client.pipeline(transaction=True) as pipe:
+                pipe.set(redis_key, 0, ex=self.window_seconds, nx=True)
+                pipe.incr(redis_key)
+                _, hits = await pipe.execute()
+        except RedisError as err:
+            # a Redis outage should not take the endpoint down with it
+            self.errors += 1
+            logger.error(f"Rate limiter {self.name} failed: {err}.")
+            return True
+
+        if hits > self.limit:
+            self.rejected += 1
+            return False
+        return True
+
+    def get_metrics(self) -> dict:
+        return {
+            "limit": self.limit,
+            "window_seconds": self.window_seconds,
+            "rejected": self.rejected,
+            "errors": self.errors,
+        }
+
+
+image_upload_limiter = RateLimiter(
+    name="image_uploads",
+    limit=settings.image_upload_rate_limit,
+    window_seconds=settings.image_upload_rate_limit_window_seconds,
+)
+
+register_collector("image_upload_limiter", image_upload_limiter.get_metrics)
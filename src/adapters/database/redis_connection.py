@@ -1,4 +1,71 @@
-import redis
+from redis.asyncio import BlockingConnectionPool, Redis
+
 from src.core import settings
+from src.core.services.metrics import register_collector
+from src.logging_config import logger
+
+
+class RedisConnection:
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        max_connections: int,
+        pool_timeout: float,
+        socket_timeout: float,
+        socket_connect_timeout: float,
+    ):
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.pool_timeout = pool_timeout
+        self.socket_timeout = socket_timeout
+        self.socket_connect_timeout = socket_connect_timeout
+        self._pool: BlockingConnectionPool | None = None
+
+    def start(self):
+        if self._pool is None:
+            self._pool = BlockingConnectionPool(
+                host=self.host,
+                port=self.port,
+                max_connections=self.max_connections,
+                timeout=self.pool_timeout,
+                socket_timeout=self.socket_timeout,
+                socket_connect_timeout=self.socket_connect_timeout,
+            )
+            logger.info(
+                f"Redis connection pool created with {self.max_connections} max connections."
+            )
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.disconnect()
+            self._pool = None
+            logger.info("Redis connection pool closed.")
+
+    @property
+    def client(self) -> Redis:
+        self.start()
+        return Redis(connection_pool=self._pool)
+
+    def get_metrics(self) -> dict:
+        if self._pool is None:
+            return {"max_connections": self.max_connections, "in_use": 0, "idle": 0}
+
+        return {
+            "max_connections": self.max_connections,
+            "in_use": len(self._pool._in_use_connections),
+            "idle": len(self._pool._available_connections),
+        }
+
+
+redis_connection = RedisConnection(
+    host=settings.redis_host,
+    port=settings.redis_port,
+    max_connections=settings.redis_max_connections,
+    pool_timeout=settings.redis_pool_timeout,
+    socket_timeout=settings.redis_socket_timeout,
+    socket_connect_timeout=settings.redis_socket_connect_timeout,
+)
 
-redis_client = redis.Redis(host=settings.redis_host, port=settings.redis_port)
+register_collector("redis_pool", redis_connection.get_metrics)
@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from redis.asyncio import Redis
+
+from src.ports.enums import RefreshTokenClaimStatus
+from src.ports.repositories.token_blacklist_repository import (
+    TokenBlacklistRepository,
+)
+
+TOKEN_KEY_PREFIX = "rt:"
+FAMILY_KEY_PREFIX = "rtf:"
+
+# KEYS[1] - refresh token id, KEYS[2] - optional token family id
+# the first claim of a token wins, a second claim of the same token means it
+# was stolen or replayed, so the whole family is revoked with one key write
+CLAIM_SCRIPT = """
+if KEYS[2] and redis.call("EXISTS", KEYS[2]) == 1 then
+    return 2
+end
+if redis.call("SET", KEYS[1], 1, "EX", ARGV[1], "NX") then
+    return 0
+end
+if KEYS[2] then
+    redis.call("SET", KEYS[2], 1, "EX", ARGV[1])
+end
+return 1
+"""
+
+CLAIM_STATUSES = {
+    0: RefreshTokenClaimStatus.CLAIMED,
+    1: RefreshTokenClaimStatus.REUSED,
+    2: RefreshTokenClaimStatus.REVOKED,
+}
+
+
+class RedisTokenBlacklistRepository(TokenBlacklistRepository):
+    def __init__(self, redis_client: Redis):
+        self.redis_client = redis_client
+        self.claim_script = redis_client.register_script(CLAIM_SCRIPT)
+
+    async def claim(
+        self, token_id: str, family_id: str | None, expire_time: timedelta
+    ) -> RefreshTokenClaimStatus:
+        keys = [TOKEN_KEY_PREFIX + token_id]
+        if family_id is not None:
+            keys.append(FAMILY_KEY_PREFIX + family_id)
+
+        result = await self.claim_script(
+            keys=keys, args=[int(expire_time.total_seconds())]
+        )
+
+        return CLAIM_STATUSES[int(result)]
+
+    async def claim_legacy(
+        self, token: str, expire_time: timedelta
+    ) -> RefreshTokenClaimStatus:
+        # tokens issued before jti was introduced were blacklisted under the raw
+        # JWT, so they keep being claimed there until the last of them expires
+        if await self.redis_client.set(token, 1, ex=expire_time, nx=True):
+            return RefreshTokenClaimStatus.CLAIMED
+        return RefreshTokenClaimStatus.REUSED
@@ -1,4 +1,5 @@
 from sqlalchemy import select, delete, UUID
+from sqlalchemy.dialects.postgresql import insert
 from fastapi import HTTPException, status
 from sqlalchemy.exc import (
     IntegrityError,
@@ -7,13 +8,20 @@ from sqlalchemy.exc import (
 )
 
 from src.logging_config import logger
+from src.adapters.database.database_settings import STICK_TO_PRIMARY
 from src.adapters.database.models.groups import Group
+from src.adapters.database.group_cache import group_cache
 from src.ports.repositories.group_repository import GroupRepository
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.ports.schemas.group import GroupNameType, GroupResponseModel
 from src.core.exceptions import InvalidRequestException
+from src.core.services.metrics import register_collector
+from src.core.services.single_flight import SingleFlight
 from pydantic import UUID4
-from typing import Union
+from typing import Union, Dict, Set
+
+group_lookups = SingleFlight()
+register_collector("group_lookups", group_lookups.get_metrics)
 
 
 class SQLAlchemyGroupRepository(GroupRepository):
@@ -48,14 +56,34 @@ class SQLAlchemyGroupRepository(GroupRepository):
             )
 
     async def get_group(self, group_id: UUID4) -> Union[GroupResponseModel, None]:
+        cached_group = group_cache.get(group_id)
+        if cached_group is not None:
+            return cached_group
+
+        if self.db_session.info.get(STICK_TO_PRIMARY):
+            # a lookup shared with other requests could miss this one's writes
+            return await self._get_group_by_id(group_id)
+
+        return await group_lookups.do(
+            str(group_id), lambda: self._get_group_by_id(group_id)
+        )
+
+    async def _get_group_by_id(
+        self, group_id: UUID4
+    ) -> Union[GroupResponseModel, None]:
         try:
+            # the row is cached for group_cache_ttl_seconds, so it is read from the
+            # primary: a lagging replica could re-cache a row that was just deleted
             query = select(Group).where(Group.id == str(group_id))
             res = (await self.db_session.execute(query)).one_or_none()
 
             if res is None:
                 return res
 
-            return res[0]
+            group = GroupResponseModel.model_validate(res[0])
+            group_cache.set(group)
+
+            return group
         except InvalidRequestError as inv_req_err:
             logger.error(f"Invalid request error: {inv_req_err}")
             raise InvalidRequestException
@@ -66,6 +94,46 @@ class SQLAlchemyGroupRepository(GroupRepository):
                 detail="An error occurred while retrieving the group.",
             )
 
+    async def get_or_create_groups(
+        self, group_names: Set[GroupNameType]
+    ) -> Dict[str, UUID4]:
+        try:
+            if group_names:
+                await self.db_session.execute(
+                    insert(Group)
+                    .values([{"name": group_name} for group_name in group_names])
+                    .on_conflict_do_nothing(index_elements=[Group.name])
+                )
+
+            query = select(Group.name, Group.id).where(Group.name.in_(group_names))
+            return {
+                group_name: group_id
+                for group_name, group_id in await self.db_session.execute(query)
+            }
+        except InvalidRequestError as inv_req_err:
+            logger.error(f"Invalid request error: {inv_req_err}")
+            raise InvalidRequestException
+        except Exception as err:
+            logger.error(f"General error: {err}.")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred while creating groups.",
+            )
+
+    async def get_existing_group_ids(self, group_ids: Set[UUID4]) -> Set[UUID4]:
+        try:
+            query = select(Group.id).where(Group.id.in_(group_ids))
+            return set(await self.db_session.scalars(query))
+        except InvalidRequestError as inv_req_err:
+            logger.error(f"Invalid request error: {inv_req_err}")
+            raise InvalidRequestException
+        except Exception as err:
+            logger.error(f"General error: {err}.")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred while retrieving groups.",
+            )
+
     async def delete_group(self, group_id: UUID4) -> Union[UUID4, None]:
         try:
             query = delete(Group).where(Group.id == str(group_id)).returning(Group.id)
@@ -73,6 +141,7 @@ class SQLAlchemyGroupRepository(GroupRepository):
             await self.db_session.commit()
 
             if res is not None:
+                await group_cache.invalidate(res)
                 return res
             else:
                 raise NoResultFound
@@ -0,0 +1,134 @@
+from fastapi import HTTPException, status
+from sqlalchemy import select, update, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Union
+
+from src.logging_config import logger
+from src.adapters.database.models.images import Image
+from src.ports.repositories.image_repository import ImageRepository
+from src.core.exceptions import InvalidRequestException
+
+
+class SQLAlchemyImageRepository(ImageRepository):
+    def __init__(self, db_session: AsyncSession):
+        self.db_session = db_session
+
+    async def image_exists(self, image_hash: str) -> bool:
+        try:
+            # objects of an image pending deletion may already be gone
+            query = select(Image.hash).where(
+                Image.hash == image_hash, Image.deleting.is_(False)
+            )
+            return await self.db_session.scalar(query) is not None
+        except InvalidRequestError as inv_req_err:
+            logger.error(f"Invalid request error: {inv_req_err}")
+            raise InvalidRequestException
+        except Exception as err:
+            logger.error(f"General error: {err}.")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred while retrieving the image.",
+            )
+
+    async def acquire_image(self, image_hash: str) -> int:
+        try:
+            query = (
+                insert(Image)
+                .values(hash=image_hash, ref_count=1)
+                .on_conflict_do_update(
+                    index_elements=[Image.hash],
+                    set_={"ref_count": Image.ref_count + 1, "deleting": False},
+                )
+                .returning(Image.ref_count)
+            )
+            return await self.db_session.scalar(query)
+        except InvalidRequestError as inv_req_err:
+            logger.error(f"Invalid request error: {inv_req_err}")
+            raise InvalidRequestException
+        except Exception as err:
+            logger.error(f"General error: {err}.")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred while referencing the image.",
+            )
+
+    async def add_unreferenced_image(self, image_hash: str):
+        try:
+            query = (
+                insert(Image)
+                .values(hash=image_hash, ref_count=0)
+                .on_conflict_do_nothing(index_elements=[Image.hash])
+            )
+            await self.db_session.execute(query)
+        except InvalidRequestError as inv_req_err:
+            logger.error(f"Invalid request error: {inv_req_err}")
+            raise InvalidRequestException
+        except Exception as err:
+            logger.error(f"General error: {err}.")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred while registering the image.",
+            )
+
+    async def release_image(self, image_hash: str) -> Union[int, None]:
+        try:
+            query = (
+                update(Image)
+                .where(Image.hash == image_hash, Image.ref_count > 0)
+                .values(ref_count=Image.ref_count - 1)
+                .returning(Image.ref_count)
+            )
+            return await self.db_session.scalar(query)
+        except InvalidRequestError as inv_req_err:
+            logger.error(f"Invalid request error: {inv_req_err}")
+            raise InvalidRequestException
+        except Exception as err:
+            logger.error(f"General error: {err}.")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred while releasing the image.",
+            )
+
+    async def mark_image_deleting(self, image_hash: str) -> bool:
+        try:
+            query = (
+                update(Image)
+                .where(Image.hash == image_hash, Image.ref_count == 0)
+                .values(deleting=True)
+                .returning(Image.hash)
+            )
+            return await self.db_session.scalar(query) is not None
+        except InvalidRequestError as inv_req_err:
+            logger.error(f"Invalid request error: {inv_req_err}")
+            raise InvalidRequestException
+        except Exception as err:
+            logger.error(f"General error: {err}.")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred while marking the image for deletion.",
+            )
+
+    async def delete_image(self, image_hash: str) -> bool:
+        try:
+            # an acquire since the mark clears it, and the row is then kept
+            query = (
+                delete(Image)
+                .where(
+                    Image.hash == image_hash,
+                    Image.ref_count == 0,
+                    Image.deleting.is_(True),
+                )
+                .returning(Image.hash)
+            )
+            return await self.db_session.scalar(query) is not None
+        except InvalidRequestError as inv_req_err:
+            logger.error(f"Invalid request error: {inv_req_err}")
+            raise InvalidRequestException
+        except Exception as err:
+            logger.error(f"General error: {err}.")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred while deleting the image.",
+            )
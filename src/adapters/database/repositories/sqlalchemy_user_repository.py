@@ -1,7 +1,24 @@
+import re
+
 from fastapi import HTTPException, status
 from fastapi.logger import logger
 from pydantic import UUID4
-from sqlalchemy import select, update, delete, asc, desc
+from sqlalchemy import (
+    select,
+    update,
+    delete,
+    exists,
+    any_,
+    bindparam,
+    String,
+    UUID,
+    asc,
+    desc,
+    or_,
+    Select,
+    Update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 
 from sqlalchemy.exc import (
     IntegrityError,
@@ -17,9 +34,41 @@ from src.ports.schemas.user import (
     UserResponseModel,
     UserResponseModelWithPassword,
 )
+from src.adapters.database.database_settings import STICK_TO_PRIMARY
 from src.adapters.database.models.users import User
+from src.adapters.database.user_cache import user_cache
+from src.adapters.database.pagination import (
+    encode_cursor,
+    decode_cursor,
+    keyset_seeks,
+)
 from src.core.exceptions import InvalidRequestException
-from typing import Union, List
+from src.core.services.metrics import register_collector
+from src.core.services.single_flight import SingleFlight
+from typing import Union, List, Tuple, AsyncIterator, Set
+
+FOREIGN_KEY_VIOLATION = "23503"
+USERNAME_PATTERN = re.compile(r"^[a-zA-Z0-9_]+$")
+PHONE_NUMBER_PATTERN = re.compile(r"^\+?[1-9]\d{1,14}$")
+KEYSET_SORT_COLUMNS = (
+    "name",
+    "surname",
+    "username",
+    "email",
+    "phone_number",
+    "created_at",
+    "modified_at",
+    "role",
+    "is_blocked",
+    "group_id",
+)
+
+user_lookups = SingleFlight()
+register_collector("user_lookups", user_lookups.get_metrics)
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
 
 class SQLAlchemyUserRepository(UserRepository):
@@ -55,26 +104,82 @@ class SQLAlchemyUserRepository(UserRepository):
                 detail="An unexpected error occurred while creating the user.",
             )
 
+    async def create_users(self, users: List[UserCreateModel]) -> Set[str]:
+        try:
+            # rows clashing with existing usernames, emails or phone numbers are
+            # skipped and simply not returned
+            query = insert(User).on_conflict_do_nothing().returning(User.username)
+            res = await self.db_session.scalars(
+                query, [user.model_dump() for user in users]
+            )
+
+            return set(res)
+        except InvalidRequestError as inv_req_err:
+            await self.db_session.rollback()
+            logger.error(f"Invalid request error: {inv_req_err}.")
+            raise InvalidRequestException
+        except Exception as err:
+            await self.db_session.rollback()
+            logger.error(f"General error: {err}.")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An unexpected error occurred while creating users.",
+            )
+
     async def get_user(
         self,
         user_id: UUID4 | None = None,
         email: str | None = None,
         username: str | None = None,
         phone_number: str | None = None,
-    ) -> Union[UserResponseModelWithPassword, None]:
-        try:
-            if user_id:
-                query = select(User).where(User.id == str(user_id))
-            elif username:
-                query = select(User).where(User.username == username)
-            elif email:
-                query = select(User).where(User.email == email)
-            elif phone_number:
-                query = select(User).where(User.phone_number == phone_number)
-            else:
-                raise InvalidRequestError
+    ) -> Union[UserResponseModel, None]:
+        if user_id:
+            cached_user = await user_cache.get(user_id)
+            if cached_user is not None:
+                return cached_user
 
-            res = (await self.db_session.execute(query)).one_or_none()
+            if self.db_session.info.get(STICK_TO_PRIMARY):
+                # a lookup shared with other requests could miss this one's writes
+                return await self._get_user_by_id(user_id)
+
+            return await user_lookups.do(
+                str(user_id), lambda: self._get_user_by_id(user_id)
+            )
+
+        if username:
+            query = select(User).where(User.username == username)
+        elif email:
+            query = select(User).where(User.email == email)
+        elif phone_number:
+            query = select(User).where(User.phone_number == phone_number)
+        else:
+            logger.error("No user identifier was provided.")
+            raise InvalidRequestException
+
+        user = await self._fetch_user(query, use_replica=True)
+        return UserResponseModel.model_validate(user) if user is not None else None
+
+    async def _get_user_by_id(self, user_id: UUID4) -> Union[UserResponseModel, None]:
+        # the row is cached for user_cache_ttl_seconds, so it is read from the
+        # primary: a lagging replica could re-cache the row an update just replaced
+        user = await self._fetch_user(
+            select(User).where(User.id == str(user_id)), use_replica=False
+        )
+        if user is None:
+            return user
+
+        # coalesced callers share this object, so it must not be session-bound
+        user = UserResponseModel.model_validate(user)
+        await user_cache.set(user)
+        return user
+
+    async def _fetch_user(self, query: Select, use_replica: bool) -> Union[User, None]:
+        try:
+            res = (
+                await self.db_session.execute(
+                    query.execution_options(use_replica=use_replica)
+                )
+            ).one_or_none()
 
             if res is None:
                 return res
@@ -90,6 +195,65 @@ class SQLAlchemyUserRepository(UserRepository):
                 detail="An error occurred while retrieving the user.",
             )
 
+    async def user_exists(self, username: str, email: str, phone_number: str) -> bool:
+        try:
+            query = select(
+                exists().where(
+                    or_(
+                        User.username == username,
+                        User.email == email,
+                        User.phone_number == phone_number,
+                    )
+                )
+            )
+            return await self.db_session.scalar(query)
+        except InvalidRequestError as inv_req_err:
+            logger.error(f"Invalid request error: {inv_req_err}.")
+            raise InvalidRequestException
+        except Exception as err:
+            logger.error(f"General error: {err}.")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred while checking the user.",
+            )
+
+    async def get_user_by_login(
+        self, login: str
+    ) -> Union[UserResponseModelWithPassword, None]:
+        try:
+            is_username = USERNAME_PATTERN.match(login) is not None
+            is_phone_number = PHONE_NUMBER_PATTERN.match(login) is not None
+
+            if "@" in login:
+                query = select(User).where(User.email == login)
+            elif is_phone_number and not is_username:
+                query = select(User).where(User.phone_number == login)
+            elif is_phone_number and is_username:
+                query = select(User).where(
+                    or_(User.username == login, User.phone_number == login)
+                )
+            else:
+                query = select(User).where(User.username == login)
+
+            users = (await self.db_session.scalars(query)).unique().all()
+
+            # digits-only logins may match one user by username and another
+            # by phone number, username wins as it did with sequential lookups
+            for user in users:
+                if user.username == login:
+                    return user
+
+            return users[0] if users else None
+        except InvalidRequestError as inv_req_err:
+            logger.error(f"Invalid request error: {inv_req_err}.")
+            raise InvalidRequestException
+        except Exception as err:
+            logger.error(f"General error: {err}.")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred while retrieving the user.",
+            )
+
     async def get_users(
         self,
         page: int = 1,
@@ -101,16 +265,9 @@ class SQLAlchemyUserRepository(UserRepository):
         order_by: str = "asc",
     ) -> List[UserResponseModel]:
         try:
-            query = select(User)
-
-            if filter_by_group_id is not None:
-                query = query.where(User.group_id == filter_by_group_id)
-
-            if filter_by_name is not None:
-                query = query.where(User.name.ilike(f"%{filter_by_name}%"))
-
-            if filter_by_surname is not None:
-                query = query.where(User.surname.ilike(f"%{filter_by_surname}%"))
+            query = self._filter_users(
+                select(User), filter_by_name, filter_by_surname, filter_by_group_id
+            )
 
             if sort_by is not None:
                 column_to_sort = getattr(User, sort_by)
@@ -121,7 +278,9 @@ class SQLAlchemyUserRepository(UserRepository):
 
             query = query.limit(limit).offset((page - 1) * limit)
 
-            users = await self.db_session.scalars(query)
+            users = await self.db_session.scalars(
+                query.execution_options(use_replica=True)
+            )
             return users.all()
         except AttributeError as attr_err:
             logger.error(f"AttributeError: {attr_err}.")
@@ -139,30 +298,281 @@ class SQLAlchemyUserRepository(UserRepository):
                 detail="An error occurred while retrieving users.",
             )
 
+    async def get_users_by_identifiers(
+        self,
+        user_ids: List[UUID4],
+        usernames: List[str],
+        emails: List[str],
+        filter_by_group_id: str = None,
+    ) -> List[UserResponseModel]:
+        try:
+            columns = [getattr(User, field) for field in UserResponseModel.model_fields]
+            # array parameters keep one prepared statement for any batch size
+            query = select(*columns).where(
+                or_(
+                    User.id
+                    == any_(
+                        bindparam("user_ids", user_ids, type_=ARRAY(UUID(as_uuid=True)))
+                    ),
+                    User.username
+                    == any_(bindparam("usernames", usernames, type_=ARRAY(String))),
+                    User.email
+                    == any_(bindparam("emails", emails, type_=ARRAY(String))),
+                )
+            )
+            if filter_by_group_id is not None:
+                query = query.where(User.group_id == filter_by_group_id)
+
+            users = await self.db_session.execute(
+                query.execution_options(use_replica=True)
+            )
+            return [
+                UserResponseModel.model_validate(dict(user))
+                for user in users.mappings()
+            ]
+        except InvalidRequestError as inv_req_err:
+            logger.error(f"Invalid request error: {inv_req_err}.")
+            raise InvalidRequestException
+        except Exception as err:
+            logger.error(f"General error: {err}.")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred while retrieving users.",
+            )
+
+    async def get_users_by_cursor(
+        self,
+        limit: int = 30,
+        cursor: str = None,
+        filter_by_name: str = None,
+        filter_by_surname: str = None,
+        filter_by_group_id: str = None,
+        sort_by: str = None,
+        order_by: str = "asc",
+    ) -> Tuple[List[UserResponseModel], Union[str, None]]:
+        if sort_by is not None and sort_by not in KEYSET_SORT_COLUMNS:
+            logger.error(f"Keyset pagination is not supported for {sort_by}.")
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Invalid attributes.",
+            )
+
+        column = getattr(User, sort_by) if sort_by is not None else None
+
+        try:
+            query = self._filter_users(
+                select(User), filter_by_name, filter_by_surname, filter_by_group_id
+            )
+
+            value, last_id = None, None
+            if cursor is not None:
+                value, last_id = decode_cursor(cursor, sort_by, order_by, column)
+
+            users = []
+            for condition, ordering in keyset_seeks(
+                column, User.id, order_by, value, last_id
+            ):
+                users.extend(
+                    (
+                        await self.db_session.scalars(
+                            query.where(condition)
+                            .order_by(*ordering)
+                            .limit(limit + 1 - len(users))
+                            .execution_options(use_replica=True)
+                        )
+                    ).all()
+                )
+                if len(users) > limit:
+                    break
+
+            next_cursor = None
+            if len(users) > limit:
+                users = users[:limit]
+                last_user = users[-1]
+                next_cursor = encode_cursor(
+                    sort_by,
+                    order_by,
+                    getattr(last_user, sort_by) if sort_by is not None else None,
+                    last_user.id,
+                )
+
+            return users, next_cursor
+        except HTTPException:
+            raise
+        except InvalidRequestError as inv_req_err:
+            logger.error(f"InvalidRequestError: {inv_req_err}.")
+            raise InvalidRequestException
+        except Exception as err:
+            logger.error(f"General error: {err}.")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred while retrieving users.",
+            )
+
+    def stream_users(
+        self,
+        filter_by_name: str = None,
+        filter_by_surname: str = None,
+        filter_by_group_id: str = None,
+        sort_by: str = None,
+        order_by: str = "asc",
+        batch_size: int = 1000,
+    ) -> AsyncIterator[List[dict]]:
+        columns = [getattr(User, field) for field in UserResponseModel.model_fields]
+
+        query = self._filter_users(
+            select(*columns), filter_by_name, filter_by_surname, filter_by_group_id
+        )
+
+        if sort_by is not None:
+            if sort_by not in UserResponseModel.model_fields:
+                logger.error(f"AttributeError: users can not be sorted by {sort_by}.")
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="Invalid attributes.",
+                )
+            column_to_sort = getattr(User, sort_by)
+            query = query.order_by(
+                asc(column_to_sort) if order_by == "asc" else desc(column_to_sort)
+            )
+
+        return self._stream_rows(query.execution_options(yield_per=batch_size))
+
+    async def _stream_rows(self, query: Select) -> AsyncIterator[List[dict]]:
+        try:
+            result = await self.db_session.stream(
+                query.execution_options(use_replica=True)
+            )
+
+            async for partition in result.mappings().partitions():
+                yield partition
+        except Exception as err:
+            logger.error(f"Error while streaming users: {err}.")
+            raise
+
+    @staticmethod
+    def _filter_users(
+        query: Union[Select, Update],
+        filter_by_name: str = None,
+        filter_by_surname: str = None,
+        filter_by_group_id: str = None,
+    ) -> Union[Select, Update]:
+        if filter_by_group_id is not None:
+            query = query.where(User.group_id == filter_by_group_id)
+
+        # plain ILIKE on the bare column is what the trigram indexes can serve
+        if filter_by_name is not None:
+            query = query.where(
+                User.name.ilike(f"%{escape_like(filter_by_name)}%", escape="\\")
+            )
+
+        if filter_by_surname is not None:
+            query = query.where(
+                User.surname.ilike(f"%{escape_like(filter_by_surname)}%", escape="\\")
+            )
+
+        return query
+
     async def update_user(
         self, user_id: UUID4, user_data: UserUpdateModelWithImage
-    ) -> Union[UserResponseModel, None]:
+    ) -> Union[Tuple[UserResponseModel, Union[str, None]], None]:
         try:
+            # the locked self-join hands back the image being replaced
+            old_user = (
+                select(User.id, User.image.label("old_image"))
+                .where(User.id == str(user_id))
+                .with_for_update()
+                .subquery()
+            )
+            columns = [getattr(User, field) for field in UserResponseModel.model_fields]
             query = (
                 update(User)
-                .where(User.id == str(user_id))
+                .where(User.id == old_user.c.id)
                 .values(**user_data.model_dump(exclude_none=True, exclude_unset=True))
-                .returning(User)
+                .returning(*columns, old_user.c.old_image)
+                .execution_options(synchronize_session=False)
             )
-            res = await self.db_session.scalar(query)
+            res = (await self.db_session.execute(query)).mappings().one_or_none()
             await self.db_session.commit()
-            await self.db_session.refresh(res)
-            return res
+
+            if res is None:
+                return res
+
+            await user_cache.invalidate(user_id)
+            return UserResponseModel.model_validate(dict(res)), res["old_image"]
+        except IntegrityError as integrity_err:
+            await self.db_session.rollback()
+            logger.error(f"Integrity error: {integrity_err}.")
+            if getattr(integrity_err.orig, "sqlstate", None) == FOREIGN_KEY_VIOLATION:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Group not found.",
+                )
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="User already exists.",
+            )
         except InvalidRequestError as inv_req_err:
+            await self.db_session.rollback()
             logger.error(f"InvalidRequestError: {inv_req_err}.")
             raise InvalidRequestException
         except Exception as err:
+            await self.db_session.rollback()
             logger.error(f"General error: {err}.")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="An error occurred while updating the user.",
             )
 
+    async def bulk_update_users(
+        self, user_ids: List[UUID4] | None, filters: dict | None, values: dict
+    ) -> List[UUID4]:
+        try:
+            query = update(User)
+
+            if user_ids is not None:
+                query = query.where(User.id.in_(user_ids))
+            else:
+                query = self._filter_users(
+                    query,
+                    filters.get("filter_by_name"),
+                    filters.get("filter_by_surname"),
+                    filters.get("filter_by_group_id"),
+                )
+                if filters.get("role") is not None:
+                    query = query.where(User.role == filters.get("role"))
+                if filters.get("is_blocked") is not None:
+                    query = query.where(User.is_blocked == filters.get("is_blocked"))
+
+            query = (
+                query.values(**values)
+                .returning(User.id)
+                .execution_options(synchronize_session=False)
+            )
+            res = (await self.db_session.scalars(query)).all()
+            await self.db_session.commit()
+            await user_cache.invalidate(*res)
+
+            return res
+        except IntegrityError as integrity_err:
+            await self.db_session.rollback()
+            logger.error(f"Integrity error: {integrity_err}.")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Group not found.",
+            )
+        except InvalidRequestError as inv_req_err:
+            await self.db_session.rollback()
+            logger.error(f"InvalidRequestError: {inv_req_err}.")
+            raise InvalidRequestException
+        except Exception as err:
+            await self.db_session.rollback()
+            logger.error(f"General error: {err}.")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="An error occurred while updating users.",
+            )
+
     async def update_password(
         self, user_id: UUID4, password: str
     ) -> Union[UserResponseModel, None]:
@@ -175,6 +585,7 @@ class SQLAlchemyUserRepository(UserRepository):
             )
             res = (await self.db_session.execute(query)).scalar_one_or_none()
             await self.db_session.commit()
+            await user_cache.invalidate(user_id)
             await self.db_session.refresh(res)
             return res
         except InvalidRequestError as inv_req_err:
@@ -187,14 +598,21 @@ class SQLAlchemyUserRepository(UserRepository):
                 detail="An error occurred while updating the user.",
             )
 
-    async def delete_user(self, user_id: UUID4) -> Union[UUID4, None]:
+    async def delete_user(
+        self, user_id: UUID4
+    ) -> Union[Tuple[UUID4, Union[str, None]], None]:
         try:
-            query = delete(User).where(User.id == str(user_id)).returning(User.id)
-            res = await self.db_session.scalar(query)
+            query = (
+                delete(User)
+                .where(User.id == str(user_id))
+                .returning(User.id, User.image)
+            )
+            res = (await self.db_session.execute(query)).one_or_none()
             await self.db_session.commit()
+            await user_cache.invalidate(user_id)
 
             if res is not None:
-                return res
+                return tuple(res)
             else:
                 raise NoResultFound
         except NoResultFound as nrf_err:
@@ -0,0 +1,117 @@
+import asyncio
+
+from sqlalchemy import func, select
+
+from src.adapters.database.database_settings import async_session
+from src.adapters.database.models.users import User
+from src.core import settings
+from src.core.services.bloom_filter import BloomFilter
+from src.core.services.metrics import register_collector
+from src.logging_config import logger
+
+IDENTIFIER_FIELDS = ("username", "email", "phone_number")
+
+
+class TakenIdentifiers:
+    """Bloom filter of usernames, emails and phone numbers already in use.
+
+    A negative answer means the identifiers are free as far as this worker
+    knows; the unique constraints still decide the signups it lets through.
+    """
+
+    def __init__(
+        self, enabled: bool, capacity: int, error_rate: float, headroom: float
+    ):
+        self.enabled = enabled
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.headroom = headroom
+        self._filter: BloomFilter | None = None
+        self._warmer: asyncio.Task | None = None
+        self.skipped_checks = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._filter is not None
+
+    def might_be_taken(self, **identifiers: str) -> bool:
+        if not self.ready:
+            return True
+
+        if any(
+            f"{field}:{value}" in self._filter for field, value in identifiers.items()
+        ):
+            return True
+
+        self.skipped_checks += 1
+        return False
+
+    def add(self, **identifiers: str):
+        if self.ready:
+            for field, value in identifiers.items():
+                self._filter.add(f"{field}:{value}")
+
+    def start(self):
+        if self.enabled and self._warmer is None:
+            self._warmer = asyncio.create_task(self._warm())
+
+    async def stop(self):
+        if self._warmer is not None:
+            self._warmer.cancel()
+            try:
+                await self._warmer
+            except asyncio.CancelledError:
+                pass
+            self._warmer = None
+
+    def filter_capacity(self, user_count: int) -> int:
+        # every user holds one entry per identifier field, and the filter has
+        # to keep its error rate while this worker adds new signups and renames
+        return max(
+            self.capacity, int(user_count * len(IDENTIFIER_FIELDS) * self.headroom)
+        )
+
+    async def _warm(self):
+        columns = [getattr(User, field) for field in IDENTIFIER_FIELDS]
+        query = select(*columns).execution_options(yield_per=10000, use_replica=True)
+
+        try:
+            async with async_session() as session:
+                user_count = await session.scalar(
+                    select(func.count())
+                    .select_from(User)
+                    .execution_options(use_replica=True)
+                )
+                bloom_filter = BloomFilter(
+                    self.filter_capacity(user_count), self.error_rate
+                )
+                result = await session.stream(query)
+                async for rows in result.partitions():
+                    for row in rows:
+                        for field, value in zip(IDENTIFIER_FIELDS, row):
+                            bloom_filter.add(f"{field}:{value}")
+        except Exception as err:
+            logger.error(f"Could not load taken identifiers: {err}.")
+            return
+
+        self._filter = bloom_filter
+        logger.info(f"Loaded {bloom_filter.count} taken identifiers.")
+
+    def get_metrics(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "ready": self.ready,
+            "identifiers": self._filter.count if self.ready else 0,
+            "capacity": self._filter.capacity if self.ready else 0,
+            "skipped_checks": self.skipped_checks,
+        }
+
+
+taken_identifiers = TakenIdentifiers(
+    enabled=settings.signup_bloom_filter_enabled,
+    capacity=settings.signup_bloom_filter_capacity,
+    error_rate=settings.signup_bloom_filter_error_rate,
+    headroom=settings.signup_bloom_filter_headroom,
+)
+
+register_collector("taken_identifiers", taken_identifiers.get_metrics)
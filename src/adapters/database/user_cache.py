@@ -0,0 +1,83 @@
+from typing import Union
+
+from pydantic import UUID4
+from redis.exceptions import RedisError
+
+from src.adapters.database.redis_connection import redis_connection
+from src.core import settings
+from src.core.services.metrics import register_collector
+from src.logging_config import logger
+from src.ports.schemas.user import UserResponseModel
+
+USER_KEY_PREFIX = "user:"
+
+
+class UserCache:
+    def __init__(self, enabled: bool, ttl_seconds: int):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get(self, user_id: UUID4) -> Union[UserResponseModel, None]:
+        if not self.enabled:
+            return None
+
+        try:
+            cached_user = await redis_connection.client.get(
+                USER_KEY_PREFIX + str(user_id)
+            )
+        except RedisError as err:
+            self.errors += 1
+            logger.error(f"User cache read failed: {err}.")
+            return None
+
+        if cached_user is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return UserResponseModel.model_validate_json(cached_user)
+
+    async def set(self, user: UserResponseModel):
+        if not self.enabled:
+            return
+
+        try:
+            await redis_connection.client.set(
+                USER_KEY_PREFIX + str(user.id),
+                user.model_dump_json(),
+                ex=self.ttl_seconds,
+            )
+        except RedisError as err:
+            self.errors += 1
+            logger.error(f"User cache write failed: {err}.")
+
+    async def invalidate(self, *user_ids: UUID4):
+        if not self.enabled or not user_ids:
+            return
+
+        try:
+            await redis_connection.client.delete(
+                *(USER_KEY_PREFIX + str(user_id) for user_id in user_ids)
+            )
+        except RedisError as err:
+            # stale entries still expire after ttl_seconds
+            self.errors += 1
+            logger.error(f"User cache invalidation failed: {err}.")
+
+    def get_metrics(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+user_cache = UserCache(
+    enabled=settings.user_cache_enabled, ttl_seconds=settings.user_cache_ttl_seconds
+)
+
+register_collector("user_cache", user_cache.get_metrics)
@@ -1,3 +1,27 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-app = FastAPI()
+from src.adapters.database.group_cache import group_cache
+from src.adapters.database.redis_connection import redis_connection
+from src.adapters.database.taken_identifiers import taken_identifiers
+from src.core.services.process_pool import process_executor
+from src.core.services.s3_service import s3_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    process_executor.start()
+    redis_connection.start()
+    group_cache.start()
+    taken_identifiers.start()
+    await s3_client.start()
+    yield
+    await s3_client.close()
+    await taken_identifiers.stop()
+    await group_cache.stop()
+    await redis_connection.close()
+    process_executor.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
@@ -1,5 +1,5 @@
 from datetime import timedelta
-from typing import List, Union
+from typing import List, Union, AsyncIterator, Tuple
 
 from fastapi import HTTPException, status, UploadFile
 from pydantic import UUID4, EmailStr
@@ -9,11 +9,18 @@ from src.adapters.database.repositories.sqlalchemy_group_repository import (
     SQLAlchemyGroupRepository,
 )
 from src.core.services.pika_client import pika_client_instance
-from src.adapters.database.redis_connection import redis_client
+from src.adapters.database.redis_connection import redis_connection
+from src.adapters.database.taken_identifiers import (
+    IDENTIFIER_FIELDS,
+    taken_identifiers,
+)
+from src.adapters.database.repositories.redis_token_blacklist_repository import (
+    RedisTokenBlacklistRepository,
+)
 from src.core import settings
-from src.ports.enums import Role, TokenType
+from src.ports.enums import Role, TokenType, RefreshTokenClaimStatus, UsersFileFormat
 from src.core.actions.group import get_db_group, create_db_group
-from src.core.services.hasher import PasswordHasher
+from src.core.services.hasher import password_hasher
 from src.core.services.token import get_token_payload
 from src.core.services.user import (
     authenticate_user,
@@ -28,13 +35,41 @@ from src.ports.schemas.user import (
     TokenData,
     PasswordModel,
     TokensResult,
+    TokenDataWithTokenType,
+    UsersCursorPageModel,
+    UserImportModel,
+    UserImportErrorModel,
+    UsersImportResultModel,
+    UsersBulkUpdateModel,
+    UsersBulkUpdateResultModel,
+    UsersBatchLookupModel,
+    UsersBatchLookupResultModel,
 )
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.concurrency import run_in_threadpool
 from src.adapters.database.repositories.sqlalchemy_user_repository import (
     SQLAlchemyUserRepository,
 )
 from src.core.services.token import generate_tokens
-from src.core.services.file_service import upload_image, delete_old_image, validate_file
+from src.core.services.user_export import users_to_csv, users_to_ndjson
+from src.core.services.user_import import (
+    read_user_rows,
+    parse_user_rows,
+    drop_duplicate_usernames,
+    batched,
+)
+from src.core.services.file_service import (
+    ValidatedImage,
+    acquire_image,
+    ensure_image_stored,
+    collect_image,
+    discard_upload,
+    load_uploaded_image,
+    release_image,
+    store_image,
+    validate_file,
+)
 from src.logging_config import logger
 
 
@@ -43,19 +78,7 @@ async def create_user(
     db_session: AsyncSession,
     image_file: Union[UploadFile, None] = None,
 ) -> UserResponseModel:
-    group_id = None
-    if user_data.group_id is not None:
-        group = await get_db_group(user_data.group_id, db_session=db_session)
-        if group is not None:
-            group_id = group.id
-
-    if group_id is None and user_data.group_name is not None:
-        group_id = (
-            await SQLAlchemyGroupRepository(db_session).create_group(
-                user_data.group_name
-            )
-        ).id
-    elif group_id is None and user_data.group_name is None:
+    if user_data.group_id is None and user_data.group_name is None:
         logger.error(
             f"Could not create group. Group name is required, because group_id is not provided or not valid."
         )
@@ -63,28 +86,66 @@ async def create_user(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Group name is required."
         )
 
-    hashed_password = PasswordHasher.get_password_hash(user_data.password)
-
-    await validate_file(image_file)
-    user_data_dict = user_data.__dict__
-    user_data_dict.update(
-        {
-            "password": hashed_password,
-            "group_id": group_id,
-            "image": (
-                await upload_image(image_file, user_data.username)
-                if image_file
-                else None
-            ),
-        }
-    )
+    identifiers = {
+        "username": user_data.username,
+        "email": user_data.email,
+        "phone_number": user_data.phone_number,
+    }
+    if taken_identifiers.might_be_taken(**identifiers):
+        user_exists = await SQLAlchemyUserRepository(db_session).user_exists(
+            **identifiers
+        )
+        await db_session.commit()
+        if user_exists:
+            logger.error(f"User {user_data.username} already exists.")
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="User already exists.",
+            )
 
-    new_user = await SQLAlchemyUserRepository(db_session).create_user(
-        UserCreateModel.model_validate(user_data_dict)
-    )
+    # hashing and the upload run while the session holds no connection
+    image = await validate_file(image_file)
+    hashed_password = await password_hasher.get_password_hash(user_data.password)
+    uploaded_image = await store_image(image, db_session) if image else None
+
+    try:
+        group_id = None
+        if user_data.group_id is not None:
+            group_id = (await get_db_group(user_data.group_id, db_session)).id
+        else:
+            group_id = (
+                await SQLAlchemyGroupRepository(db_session).create_group(
+                    user_data.group_name
+                )
+            ).id
+
+        if uploaded_image is not None:
+            await acquire_image(image, db_session)
+
+        user_data_dict = user_data.__dict__
+        user_data_dict.update(
+            {
+                "password": hashed_password,
+                "group_id": group_id,
+                "image": uploaded_image.url if uploaded_image else None,
+                "image_variants": uploaded_image.variants if uploaded_image else None,
+            }
+        )
 
-    await db_session.commit()
+        new_user = await SQLAlchemyUserRepository(db_session).create_user(
+            UserCreateModel.model_validate(user_data_dict)
+        )
+
+        await db_session.commit()
+    except Exception:
+        if uploaded_image is not None:
+            await collect_image(uploaded_image, db_session)
+        raise
 
+    if uploaded_image is not None:
+        await ensure_image_stored(image)
+
+    taken_identifiers.add(**identifiers)
     return new_user
 
 
@@ -117,29 +178,91 @@ async def get_updated_db_user(
     db_session: AsyncSession,
     image_file: Union[UploadFile, None] = None,
 ) -> UserResponseModel:
-    user = await SQLAlchemyUserRepository(db_session).get_user(user_id=user_id)
-    if user is None:
+    image = await validate_file(image_file)
+    return await update_db_user(user_id, update_data, db_session, image)
+
+
+async def confirm_image_upload(
+    user_id: UUID4, key: str, db_session: AsyncSession
+) -> UserResponseModel:
+    image = await load_uploaded_image(user_id, key)
+    try:
+        return await update_db_user(
+            user_id, UserUpdateModelWithoutImage(), db_session, image
+        )
+    finally:
+        # the variants are stored under their own keys, the upload is not needed
+        await discard_upload(key)
+
+
+async def update_db_user(
+    user_id: UUID4,
+    update_data: UserUpdateModelWithoutImage,
+    db_session: AsyncSession,
+    image: Union[ValidatedImage, None] = None,
+) -> UserResponseModel:
+    # the upload runs before the session checks out a connection
+    uploaded_image = None
+    update_model = update_data.model_dump()
+    if image is not None:
+        uploaded_image = await store_image(image, db_session)
+        update_model.update(
+            {"image": uploaded_image.url, "image_variants": uploaded_image.variants}
+        )
+
+    user_data_dict = UserUpdateModelWithImage.model_validate(update_model)
+
+    try:
+        if uploaded_image is not None:
+            await acquire_image(image, db_session)
+
+        # update_user commits the new reference together with the user row
+        res = await SQLAlchemyUserRepository(db_session).update_user(
+            user_id, user_data_dict
+        )
+    except Exception:
+        if uploaded_image is not None:
+            await collect_image(uploaded_image, db_session)
+        raise
+
+    if res is None:
+        if uploaded_image is not None:
+            await release_image(uploaded_image.url, db_session)
         logger.error(f"User with id {user_id} is not found.")
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found.",
         )
 
-    if update_data.group_id is not None:
-        await get_db_group(update_data.group_id, db_session)
+    updated_user, old_image_url = res
+    if uploaded_image is not None:
+        await ensure_image_stored(image)
+        if old_image_url is not None:
+            await release_image(old_image_url, db_session)
+
+    taken_identifiers.add(
+        **{
+            field: update_model[field]
+            for field in IDENTIFIER_FIELDS
+            if update_model.get(field) is not None
+        }
+    )
+
+    return updated_user
 
-    image_url = None
-    if image_file is not None:
-        if user.image is not None and await validate_file(image_file):
-            await delete_old_image(user.image)
-        image_url = await upload_image(image_file, str(user_id))
 
-    update_model = update_data.model_dump()
-    update_model.update({"image": image_url})
-    user_data_dict = UserUpdateModelWithImage.model_validate(update_model)
+async def bulk_update_db_users(
+    bulk_update: UsersBulkUpdateModel, db_session: AsyncSession
+) -> UsersBulkUpdateResultModel:
+    user_ids = await SQLAlchemyUserRepository(db_session).bulk_update_users(
+        user_ids=bulk_update.user_ids,
+        filters=bulk_update.filter.model_dump() if bulk_update.filter else None,
+        values=bulk_update.changes.model_dump(exclude_none=True),
+    )
 
-    return await SQLAlchemyUserRepository(db_session).update_user(
-        user_id, user_data_dict
+    logger.info(f"Bulk update changed {len(user_ids)} users.")
+    return UsersBulkUpdateResultModel(
+        affected=len(user_ids), user_ids=user_ids if bulk_update.return_ids else None
     )
 
 
@@ -183,56 +306,59 @@ async def get_db_user_by_username(
 
 
 async def delete_db_user(user_id: UUID4, db_session: AsyncSession) -> UUID4:
-    return await SQLAlchemyUserRepository(db_session).delete_user(user_id)
+    user_id, image_url = await SQLAlchemyUserRepository(db_session).delete_user(user_id)
 
+    if image_url is not None:
+        await release_image(image_url, db_session)
 
-async def refresh_tokens(refresh_token, db_session: AsyncSession) -> TokensResult:
-    if redis_client.get(str(refresh_token)) is not None:
-        logger.error(f"Invalid refresh token. Blacklisted.")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid refresh token. Blacklisted.",
-        )
+    return user_id
 
+
+async def refresh_tokens(refresh_token, db_session: AsyncSession) -> TokensResult:
     token_payload = get_token_payload(refresh_token)
 
     if token_payload.token_type != TokenType.REFRESH:
         raise CredentialsException("Invalid token type. It's not a refresh token.")
 
-    # check if user with user_id exists
-    await get_db_user_by_id(user_id=token_payload.user_id, db_session=db_session)
-
-    res = generate_tokens(token_payload)
-
     expire_time = timedelta(minutes=settings.refresh_token_expire_minutes)
 
-    redis_client.setex(str(refresh_token), expire_time, value=1)
+    token_blacklist = RedisTokenBlacklistRepository(redis_connection.client)
+    if token_payload.jti is None:
+        claim_status = await token_blacklist.claim_legacy(refresh_token, expire_time)
+    else:
+        claim_status = await token_blacklist.claim(
+            token_payload.jti, token_payload.family_id, expire_time
+        )
+
+    if claim_status == RefreshTokenClaimStatus.REUSED:
+        if token_payload.family_id is not None:
+            logger.error(
+                f"Refresh token reuse detected. Token family {token_payload.family_id} revoked."
+            )
+        else:
+            logger.error(
+                f"Refresh token reuse detected. Token {token_payload.jti or 'without jti'} rejected."
+            )
+    if claim_status != RefreshTokenClaimStatus.CLAIMED:
+        logger.error(f"Invalid refresh token. Blacklisted.")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid refresh token. Blacklisted.",
+        )
 
-    return res
+    # check if user with user_id exists
+    await get_db_user_by_id(user_id=token_payload.user_id, db_session=db_session)
 
+    return generate_tokens(token_payload, family_id=token_payload.family_id)
 
-async def get_users_for_admin_and_moderator(**kwargs) -> List[UserResponseModel]:
-    payload = get_token_payload(kwargs.get("token"))
 
+def get_group_scope_for_admin_and_moderator(
+    payload: TokenDataWithTokenType,
+) -> Union[str, None]:
     if payload.role == Role.ADMIN:
-        return await SQLAlchemyUserRepository(kwargs.get("db_session")).get_users(
-            page=kwargs.get("page"),
-            limit=kwargs.get("limit"),
-            filter_by_name=kwargs.get("filter_by_name"),
-            filter_by_surname=kwargs.get("filter_by_surname"),
-            sort_by=kwargs.get("sort_by"),
-            order_by=kwargs.get("order_by"),
-        )
+        return None
     elif payload.role == Role.MODERATOR:
-        return await SQLAlchemyUserRepository(kwargs.get("db_session")).get_users(
-            page=kwargs.get("page"),
-            limit=kwargs.get("limit"),
-            filter_by_name=kwargs.get("filter_by_name"),
-            filter_by_surname=kwargs.get("filter_by_surname"),
-            filter_by_group_id=payload.group_id,
-            sort_by=kwargs.get("sort_by"),
-            order_by=kwargs.get("order_by"),
-        )
+        return payload.group_id
     else:
         logger.error(
             f"User with the {payload.role} role does not have access. You are not {Role.ADMIN} or {Role.MODERATOR}."
@@ -244,6 +370,178 @@ async def get_users_for_admin_and_moderator(**kwargs) -> List[UserResponseModel]
         )
 
 
+async def get_users_for_admin_and_moderator(**kwargs) -> List[UserResponseModel]:
+    filter_by_group_id = get_group_scope_for_admin_and_moderator(
+        kwargs.get("token_payload")
+    )
+
+    return await SQLAlchemyUserRepository(kwargs.get("db_session")).get_users(
+        page=kwargs.get("page"),
+        limit=kwargs.get("limit"),
+        filter_by_name=kwargs.get("filter_by_name"),
+        filter_by_surname=kwargs.get("filter_by_surname"),
+        filter_by_group_id=filter_by_group_id,
+        sort_by=kwargs.get("sort_by"),
+        order_by=kwargs.get("order_by"),
+    )
+
+
+async def get_users_page_for_admin_and_moderator(**kwargs) -> UsersCursorPageModel:
+    filter_by_group_id = get_group_scope_for_admin_and_moderator(
+        kwargs.get("token_payload")
+    )
+
+    users, next_cursor = await SQLAlchemyUserRepository(
+        kwargs.get("db_session")
+    ).get_users_by_cursor(
+        limit=kwargs.get("limit"),
+        cursor=kwargs.get("cursor"),
+        filter_by_name=kwargs.get("filter_by_name"),
+        filter_by_surname=kwargs.get("filter_by_surname"),
+        filter_by_group_id=filter_by_group_id,
+        sort_by=kwargs.get("sort_by"),
+        order_by=kwargs.get("order_by"),
+    )
+
+    return UsersCursorPageModel(users=users, next_cursor=next_cursor)
+
+
+async def get_users_batch_for_admin_and_moderator(
+    batch_lookup: UsersBatchLookupModel,
+    token_payload: TokenDataWithTokenType,
+    db_session: AsyncSession,
+) -> UsersBatchLookupResultModel:
+    # moderators get users outside their group left out instead of a 403
+    filter_by_group_id = get_group_scope_for_admin_and_moderator(token_payload)
+
+    users = await SQLAlchemyUserRepository(db_session).get_users_by_identifiers(
+        user_ids=batch_lookup.user_ids,
+        usernames=batch_lookup.usernames,
+        emails=batch_lookup.emails,
+        filter_by_group_id=filter_by_group_id,
+    )
+
+    return UsersBatchLookupResultModel(users={user.id: user for user in users})
+
+
+def export_users(
+    export_format: UsersFileFormat, db_session: AsyncSession, **kwargs
+) -> AsyncIterator[str]:
+    partitions = SQLAlchemyUserRepository(db_session).stream_users(
+        filter_by_name=kwargs.get("filter_by_name"),
+        filter_by_surname=kwargs.get("filter_by_surname"),
+        sort_by=kwargs.get("sort_by"),
+        order_by=kwargs.get("order_by"),
+        batch_size=settings.users_export_batch_size,
+    )
+
+    if export_format == UsersFileFormat.CSV:
+        return users_to_csv(partitions)
+
+    return users_to_ndjson(partitions)
+
+
+async def import_users(
+    file: UploadFile, file_format: UsersFileFormat, db_session: AsyncSession
+) -> UsersImportResultModel:
+    result = UsersImportResultModel()
+    seen_usernames = set()
+
+    batches = batched(
+        read_user_rows(file.file, file_format), settings.users_import_batch_size
+    )
+    # the upload may have been spooled to disk, so it is read off the event loop
+    while batch := await run_in_threadpool(next, batches, None):
+        users, errors = parse_user_rows(batch)
+        result.errors.extend(errors)
+
+        users, errors = drop_duplicate_usernames(users, seen_usernames)
+        result.errors.extend(errors)
+
+        if not users:
+            continue
+        try:
+            imported, errors = await import_users_batch(users, db_session)
+        except (HTTPException, SQLAlchemyError) as err:
+            # earlier batches are committed, so a failed one is reported, not raised
+            await db_session.rollback()
+            logger.error(f"Import batch failed: {err}.")
+            detail = getattr(err, "detail", "Batch could not be imported.")
+            imported, errors = 0, [
+                UserImportErrorModel(line=line, detail=detail) for line, _ in users
+            ]
+        result.imported += imported
+        result.errors.extend(errors)
+
+    await file.close()
+
+    result.errors.sort(key=lambda error: error.line)
+    logger.info(
+        f"Imported {result.imported} users, {len(result.errors)} rows rejected."
+    )
+    return result
+
+
+async def import_users_batch(
+    users: List[Tuple[int, UserImportModel]], db_session: AsyncSession
+) -> Tuple[int, List[UserImportErrorModel]]:
+    group_repository = SQLAlchemyGroupRepository(db_session)
+    existing_group_ids = await group_repository.get_existing_group_ids(
+        {user.group_id for _, user in users if user.group_id is not None}
+    )
+    # hashing takes seconds per batch, so no connection is held meanwhile
+    await db_session.commit()
+
+    errors, users_to_create = [], []
+    for line, user in users:
+        if user.group_id is not None and user.group_id not in existing_group_ids:
+            errors.append(UserImportErrorModel(line=line, detail="Group not found."))
+        elif user.group_id is None and user.group_name is None:
+            errors.append(
+                UserImportErrorModel(line=line, detail="Group name is required.")
+            )
+        else:
+            users_to_create.append((line, user))
+
+    if not users_to_create:
+        return 0, errors
+
+    # the import leaves part of the pool free for logins and sign-ups
+    hashed_passwords = await password_hasher.get_password_hashes(
+        [user.password for _, user in users_to_create],
+        max_workers=max(
+            1, int(password_hasher.max_workers * settings.users_import_hasher_share)
+        ),
+    )
+
+    group_ids_by_name = await group_repository.get_or_create_groups(
+        {user.group_name for _, user in users_to_create if user.group_id is None}
+    )
+    created_usernames = await SQLAlchemyUserRepository(db_session).create_users(
+        [
+            UserCreateModel(
+                **user.model_dump(exclude={"password", "group_id", "group_name"}),
+                password=hashed_password,
+                group_id=user.group_id or group_ids_by_name[user.group_name],
+            )
+            for (_, user), hashed_password in zip(users_to_create, hashed_passwords)
+        ]
+    )
+    await db_session.commit()
+
+    for line, user in users_to_create:
+        if user.username in created_usernames:
+            taken_identifiers.add(
+                **{field: getattr(user, field) for field in IDENTIFIER_FIELDS}
+            )
+        else:
+            errors.append(
+                UserImportErrorModel(line=line, detail="User already exists.")
+            )
+
+    return len(created_usernames), errors
+
+
 async def request_reset_user_password(email: EmailStr, db_session):
     user = await get_db_user_by_email(email, db_session)
 
@@ -285,7 +583,7 @@ async def reset_user_password(
             status_code=status.HTTP_403_FORBIDDEN, detail="You are blocked."
         )
 
-    hashed_password = PasswordHasher.get_password_hash(new_password.password)
+    hashed_password = await password_hasher.get_password_hash(new_password.password)
 
     return await SQLAlchemyUserRepository(db_session).update_password(
         user_id, hashed_password
@@ -8,9 +8,31 @@ class PydanticSettings(BaseSettings):
     db_host: str = None
     db_port: str = None
     db_database_name: str = None
+    db_replica_hosts: str | None = None
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_prepared_statement_cache_size: int = 100
+    db_statement_timeout_ms: int | None = None
     redis_host: str = None
     redis_port: int = None
     redis_password: str = None
+    redis_max_connections: int = 50
+    redis_pool_timeout: float = 5.0
+    redis_socket_timeout: float = 5.0
+    redis_socket_connect_timeout: float = 5.0
+    user_cache_enabled: bool = True
+    user_cache_ttl_seconds: int = 300
+    group_cache_enabled: bool = True
+    group_cache_max_size: int = 1024
+    group_cache_ttl_seconds: int = 300
+    group_cache_pubsub_enabled: bool = False
+    signup_bloom_filter_enabled: bool = False
+    signup_bloom_filter_capacity: int = 1_000_000
+    signup_bloom_filter_error_rate: float = 0.01
+    signup_bloom_filter_headroom: float = 1.5
     secret_key: str = None
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
@@ -30,9 +52,25 @@ class PydanticSettings(BaseSettings):
     localstack_access_key_id: str = None
     localstack_secret_access_key: str = None
     s3_bucket_name: str = None
+    s3_max_pool_connections: int = 20
+    s3_connect_timeout: float = 5.0
+    s3_read_timeout: float = 30.0
+    s3_keepalive_timeout: float = 60.0
+    s3_max_attempts: int = 3
+    s3_upload_url_expires_seconds: int = 300
+    image_upload_rate_limit: int = 10
+    image_upload_rate_limit_window_seconds: int = 3600
     app_host: str = None
     app_http_schema: str = None
     app_port: int = None
+    users_export_batch_size: int = 1000
+    users_import_batch_size: int = 1000
+    users_import_hasher_share: float = 0.5
+    process_pool_max_workers: int | None = None
+    password_hasher_max_workers: int | None = None
+    password_hasher_max_queue_size: int = 100
+    image_processor_max_workers: int | None = None
+    image_processor_max_queue_size: int = 50
 
     @property
     def get_db_creds(self):
@@ -44,3 +82,16 @@ class PydanticSettings(BaseSettings):
             "database": self.db_database_name,
             "password": self.db_password,
         }
+
+    @property
+    def get_db_replica_creds(self):
+        if not self.db_replica_hosts:
+            return []
+
+        replica_creds = []
+        for replica_host in self.db_replica_hosts.split(","):
+            host, _, port = replica_host.strip().partition(":")
+            replica_creds.append(
+                {**self.get_db_creds, "host": host, "port": port or self.db_port}
+            )
+        return replica_creds
@@ -1,17 +1,16 @@
-from fastapi import Security, HTTPException, status
-from fastapi.security import HTTPAuthorizationCredentials
+from fastapi import Depends, HTTPException, status
 from pydantic import UUID4
 
 from src.logging_config import logger
 from src.ports.enums import Role
-from src.core.services.token import get_token_payload
-from src.core import security
+from src.ports.schemas.user import TokenDataWithTokenType
+from src.core.services.token import get_current_token_payload
 
 
 def check_current_user_for_admin(
-    token: HTTPAuthorizationCredentials = Security(security),
+    token_payload: TokenDataWithTokenType = Depends(get_current_token_payload),
 ) -> bool:
-    current_user_role = get_token_payload(token.credentials).role
+    current_user_role = token_payload.role
 
     if current_user_role != Role.ADMIN:
         logger.error(
@@ -26,14 +25,14 @@ def check_current_user_for_admin(
 
 
 async def check_current_user_for_moderator_and_admin(
-    group_id: UUID4, token: str
+    group_id: UUID4, token_payload: TokenDataWithTokenType
 ) -> bool:
-    role = get_token_payload(token).role
+    role = token_payload.role
 
     if role == Role.ADMIN:
         return True
     elif role == Role.MODERATOR:
-        group_id_current_user_belongs_to = get_token_payload(token).group_id
+        group_id_current_user_belongs_to = token_payload.group_id
         if str(group_id) != group_id_current_user_belongs_to:
             logger.error(
                 f"User with role {role} is not allowed to access this. Must belongs to group with {group_id_current_user_belongs_to}."
@@ -53,9 +52,9 @@ async def check_current_user_for_moderator_and_admin(
 
 
 def check_curr_user_for_block_status(
-    token: HTTPAuthorizationCredentials = Security(security),
+    token_payload: TokenDataWithTokenType = Depends(get_current_token_payload),
 ) -> bool:
-    if get_token_payload(token.credentials).is_blocked:
+    if token_payload.is_blocked:
         logger.error(f"Current user is blocked.")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="You are blocked."
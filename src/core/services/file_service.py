@@ -1,77 +1,369 @@
+import asyncio
 import hashlib
+import re
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Union
 
+from botocore.exceptions import ClientError
 from fastapi import UploadFile, HTTPException, status
+from pydantic import UUID4
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.logging_config import logger
 
 from src.core import settings
 from src.adapters.aws_repository import AwsRepository
+from src.adapters.database.rate_limiter import image_upload_limiter
+from src.adapters.database.repositories.sqlalchemy_image_repository import (
+    SQLAlchemyImageRepository,
+)
+from src.core.services.image_processor import (
+    AVATAR_FORMATS,
+    AVATAR_SIZES,
+    image_processor,
+)
 from src.ports.enums import SupportedFileTypes
+from src.ports.schemas.user import ImageUploadModel
 
 
-async def validate_file(file: UploadFile) -> bool:
+MAX_IMAGE_SIZE = 1024 * 1024
+IMAGE_CHUNK_SIZE = 64 * 1024
+CONTENT_DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+IMAGE_SIGNATURES = {
+    SupportedFileTypes.PNG: b"\x89PNG\r\n\x1a\n",
+    SupportedFileTypes.JPEG: b"\xff\xd8\xff",
+}
+IMAGE_SIGNATURE_LENGTH = max(len(signature) for signature in IMAGE_SIGNATURES.values())
+IMAGE_UPLOAD_PREFIX = "uploads"
+
+
+@dataclass
+class UploadedImage:
+    digest: str
+    url: str
+    variants: Dict[str, Dict[str, str]]
+
+
+@dataclass
+class ValidatedImage:
+    contents: bytes
+    content_type: SupportedFileTypes
+    digest: str
+
+
+def sniff_image_type(head: bytes) -> Union[SupportedFileTypes, None]:
+    for content_type, signature in IMAGE_SIGNATURES.items():
+        if head.startswith(signature):
+            return content_type
+    return None
+
+
+async def validate_file(file: UploadFile) -> Union[ValidatedImage, None]:
     if file is None:
-        return False
+        return None
+
+    chunks = []
+    size = 0
+    content_type = None
+    content_hash = hashlib.sha256()
+    # read once: the size cap, the type sniffing and the hash share one pass
+    while chunk := await file.read(IMAGE_CHUNK_SIZE):
+        if content_type is None:
+            content_type = sniff_image_type(chunk)
+            if content_type is None:
+                await file.close()
+                logger.error(
+                    f"File {file.filename} is not {SupportedFileTypes.PNG} or {SupportedFileTypes.JPEG}"
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Supported file types are png and jpeg.",
+                )
+
+        size += len(chunk)
+        if size >= MAX_IMAGE_SIZE:
+            await file.close()
+            logger.error(f"Size of file {file.filename} not from 0 to 1024KB")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Supported file size is 0 - 1 MB.",
+            )
 
-    contents = await file.read()
-    size = len(contents)
-    if not 0 < size < 1024 * 1024:
-        await file.close()
+        chunks.append(chunk)
+        content_hash.update(chunk)
+
+    await file.close()
+
+    if size == 0:
         logger.error(f"Size of file {file.filename} not from 0 to 1024KB")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Supported file size is 0 - 1 MB.",
         )
 
-    await file.seek(0)
+    logger.info(f"File {file.filename} successfully validated.")
+    return ValidatedImage(b"".join(chunks), content_type, content_hash.hexdigest())
+
+
+def image_upload_prefix(user_id: UUID4) -> str:
+    return f"{IMAGE_UPLOAD_PREFIX}/{user_id}/"
 
-    content_type = file.content_type
-    if (
-        content_type != SupportedFileTypes.PNG
-        and content_type != SupportedFileTypes.JPEG
-    ):
-        await file.close()
-        logger.error(
-            f"Supported file type is {content_type}. Must be {SupportedFileTypes.PNG} or {SupportedFileTypes.JPEG}"
+
+async def create_image_upload(
+    user_id: UUID4, content_type: SupportedFileTypes
+) -> ImageUploadModel:
+    if not await image_upload_limiter.allow(str(user_id)):
+        logger.error(f"User {user_id} requested too many image uploads.")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many image uploads. Try again later.",
         )
+
+    key = f"{image_upload_prefix(user_id)}{uuid.uuid4().hex}"
+    presigned_post = await AwsRepository().generate_presigned_post(
+        key,
+        content_type,
+        MAX_IMAGE_SIZE - 1,
+        settings.s3_upload_url_expires_seconds,
+    )
+
+    logger.info(f"Upload {key} issued for user {user_id}.")
+    return ImageUploadModel(
+        url=presigned_post["url"],
+        fields=presigned_post["fields"],
+        key=key,
+        expires_in=settings.s3_upload_url_expires_seconds,
+    )
+
+
+def is_valid_upload(head: bytes, size: int, content_type: str) -> bool:
+    return 0 < size < MAX_IMAGE_SIZE and sniff_image_type(head) == content_type
+
+
+async def read_upload(key: str, byte_range: Union[str, None] = None) -> bytes:
+    response = await AwsRepository().get(key, byte_range)
+    async with response["Body"] as body:
+        return await body.read()
+
+
+async def load_uploaded_image(user_id: UUID4, key: str) -> ValidatedImage:
+    # only keys in the exact shape create_image_upload issues are accepted
+    if not re.fullmatch(re.escape(image_upload_prefix(user_id)) + r"[0-9a-f]{32}", key):
+        logger.error(f"Upload {key} does not belong to user {user_id}.")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Upload does not belong to the user.",
+        )
+
+    try:
+        # the metadata and the signature bytes reject a bad upload before
+        # the whole object is downloaded
+        metadata = await AwsRepository().head(key)
+        head = await read_upload(key, f"bytes=0-{IMAGE_SIGNATURE_LENGTH - 1}")
+        is_valid = is_valid_upload(
+            head, metadata["ContentLength"], metadata["ContentType"]
+        )
+
+        contents = b""
+        if is_valid:
+            contents = await read_upload(key)
+            # the object may have been replaced since the HEAD request
+            is_valid = is_valid_upload(contents, len(contents), metadata["ContentType"])
+    except ClientError as err:
+        if err.response["Error"]["Code"] in ("404", "NoSuchKey"):
+            logger.error(f"Upload {key} does not exist.")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Upload not found.",
+            )
+        logger.error(f"Error with {key}: {err}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error with retrieving from bucket.",
+        )
+
+    if not is_valid:
+        await discard_upload(key)
+        logger.error(f"Upload {key} is not a valid image.")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Supported file types are png and jpeg.",
+            detail="Supported file types are png and jpeg, size 0 - 1 MB.",
         )
 
-    logger.info(f"File {file.filename} successfully validated.")
-    return True
+    logger.info(f"Upload {key} successfully validated.")
+    return ValidatedImage(
+        contents, sniff_image_type(contents), hashlib.sha256(contents).hexdigest()
+    )
 
 
-async def upload_image(image_file: UploadFile, key: str) -> str:
-    contents = await image_file.read()
+async def discard_upload(key: str):
+    try:
+        await AwsRepository().delete(key)
+    except Exception as e:
+        logger.error(f"Upload {key} could not be deleted and is left orphaned: {e}")
 
-    await image_file.close()
 
-    image_hash = hashlib.md5()
-    image_hash.update(contents)
-    image_hash.update(key.encode())
+def image_url(key: str) -> str:
+    return f"{settings.localstack_endpoint_url}/{settings.s3_bucket_name}/{key}"
 
-    combined_hash = image_hash.hexdigest()
 
-    filename = f"{combined_hash}.png"
+def image_keys(url: str) -> List[str]:
+    key = url.rsplit(f"/{settings.s3_bucket_name}/", 1)[-1]
+    prefix, slash, _ = key.rpartition("/")
+    if not slash:
+        # avatars uploaded before variants were introduced are single objects
+        return [key]
 
-    await AwsRepository().add_one(contents, filename)
+    return [
+        f"{prefix}/{size}.{extension}"
+        for size in AVATAR_SIZES
+        for extension in AVATAR_FORMATS
+    ]
 
-    logger.info(f"File {filename} successfully uploaded.")
-    return f"{settings.localstack_endpoint_url}/{settings.s3_bucket_name}/{filename}"
 
+def image_digest(url: str) -> Union[str, None]:
+    prefix = image_keys(url)[0].partition("/")[0]
+    return prefix if CONTENT_DIGEST_PATTERN.match(prefix) else None
+
+
+def stored_image(digest: str) -> UploadedImage:
+    return UploadedImage(
+        digest=digest,
+        url=image_url(f"{digest}/{max(AVATAR_SIZES)}.jpeg"),
+        variants={
+            extension: {
+                str(size): image_url(f"{digest}/{size}.{extension}")
+                for size in AVATAR_SIZES
+            }
+            for extension in AVATAR_FORMATS
+        },
+    )
+
+
+async def upload_image(image: ValidatedImage) -> UploadedImage:
+    variants = await image_processor.render_avatar_variants(image.contents)
+
+    # keys depend only on the content, so a retried or concurrent upload of the
+    # same image rewrites identical objects
+    await asyncio.gather(
+        *(
+            AwsRepository().add_one(
+                body,
+                f"{image.digest}/{filename}",
+                AVATAR_FORMATS[filename.rpartition(".")[2]][1],
+            )
+            for filename, body in variants.items()
+        )
+    )
+
+    logger.info(f"Image variants {image.digest} successfully uploaded.")
+    return stored_image(image.digest)
 
-async def delete_old_image(url: str):
-    last_slash_index = url.rfind("/")
 
-    filename = url[last_slash_index + 1 :]
+async def store_image(image: ValidatedImage, db_session: AsyncSession) -> UploadedImage:
+    exists = await SQLAlchemyImageRepository(db_session).image_exists(image.digest)
+    await db_session.commit()
 
+    if exists:
+        logger.info(f"Image {image.digest} is already stored.")
+        return stored_image(image.digest)
+
+    return await upload_image(image)
+
+
+async def acquire_image(image: ValidatedImage, db_session: AsyncSession):
+    # runs in the caller's transaction, before its commit
+    await SQLAlchemyImageRepository(db_session).acquire_image(image.digest)
+
+
+async def ensure_image_stored(image: ValidatedImage):
+    # runs after the caller's commit: a deletion that was in progress when the
+    # image was stored or acquired may have removed its objects meanwhile
+    keys = image_keys(stored_image(image.digest).url)
     try:
-        await AwsRepository().delete(filename)
-        logger.info(f"Old file {filename} successfully deleted.")
+        await asyncio.gather(*(AwsRepository().head(key) for key in keys))
+        return
+    except ClientError as err:
+        if err.response["Error"]["Code"] not in ("404", "NoSuchKey"):
+            logger.error(f"Error with {keys}: {err}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error with retrieving from bucket.",
+            )
+
+    logger.info(f"Image {image.digest} was deleted meanwhile and is uploaded again.")
+    await upload_image(image)
+
+
+async def release_image(url: str, db_session: AsyncSession):
+    digest = image_digest(url)
+    if digest is None:
+        await discard_image(url)
+        return
+
+    try:
+        ref_count = await SQLAlchemyImageRepository(db_session).release_image(digest)
+        await db_session.commit()
+    except HTTPException:
+        await db_session.rollback()
+        logger.error(f"Image {digest} could not be released.")
+        return
+
+    if ref_count == 0:
+        await delete_unreferenced_image(url, db_session)
+
+
+async def collect_image(image: UploadedImage, db_session: AsyncSession):
+    # after a failed write the objects may have no images row at all, so one is
+    # added with no references and removed the same way a released image is
+    await db_session.rollback()
+    try:
+        await SQLAlchemyImageRepository(db_session).add_unreferenced_image(image.digest)
+        await db_session.commit()
+    except HTTPException:
+        await db_session.rollback()
+        logger.error(f"Image {image.digest} could not be collected.")
+        return
+
+    await delete_unreferenced_image(image.url, db_session)
+
+
+async def delete_unreferenced_image(url: str, db_session: AsyncSession):
+    digest = image_digest(url)
+    image_repository = SQLAlchemyImageRepository(db_session)
+    try:
+        # the mark is committed first, so no transaction is open during the
+        # S3 calls; acquiring the image meanwhile clears it and keeps the row
+        marked = await image_repository.mark_image_deleting(digest)
+        await db_session.commit()
+        if not marked:
+            return
+
+        await delete_old_image(url)
+        if not await image_repository.delete_image(digest):
+            logger.info(f"Image {digest} was acquired while it was being deleted.")
+        await db_session.commit()
+    except HTTPException:
+        await db_session.rollback()
+        logger.error(f"Image {digest} could not be deleted.")
+
+
+async def delete_old_image(url: str):
+    keys = image_keys(url)
+
+    try:
+        await asyncio.gather(*(AwsRepository().delete(key) for key in keys))
+        logger.info(f"Old files {keys} successfully deleted.")
     except Exception as e:
-        logger.error(f"Error with {filename}: {e}")
+        logger.error(f"Error with {keys}: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error with retrieving from bucket.",
         )
+
+
+async def discard_image(url: str):
+    try:
+        await delete_old_image(url)
+    except HTTPException:
+        logger.error(f"Image {url} could not be deleted and is left orphaned.")
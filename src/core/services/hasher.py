@@ -1,14 +1,77 @@
+import asyncio
+import time
+
 from passlib.context import CryptContext
 
+from src.core import settings
+from src.core.services.metrics import register_collector
+from src.core.services.process_pool import (
+    BoundedProcessPool,
+    ProcessExecutor,
+    process_executor,
+)
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
-class PasswordHasher:
-    @staticmethod
-    def verify_password(plain_password, hashed_password):
-        return pwd_context.verify(plain_password, hashed_password)
+def _hash_password(password: str) -> tuple[str, float]:
+    start = time.perf_counter()
+    hashed_password = pwd_context.hash(password)
+    return hashed_password, time.perf_counter() - start
+
+
+def _verify_password(plain_password: str, hashed_password: str) -> tuple[bool, float]:
+    start = time.perf_counter()
+    is_valid = pwd_context.verify(plain_password, hashed_password)
+    return is_valid, time.perf_counter() - start
+
+
+def _hash_passwords(passwords: list[str]) -> tuple[list[str], float]:
+    start = time.perf_counter()
+    hashed_passwords = [pwd_context.hash(password) for password in passwords]
+    return hashed_passwords, time.perf_counter() - start
+
+
+class PasswordHasher(BoundedProcessPool):
+    def __init__(
+        self,
+        max_workers: int | None,
+        max_queue_size: int,
+        executor: ProcessExecutor = process_executor,
+    ):
+        super().__init__("Password hasher", max_workers, max_queue_size, executor)
+
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(_verify_password, plain_password, hashed_password)
+
+    async def get_password_hash(self, password: str) -> str:
+        return await self.run(_hash_password, password)
+
+    async def get_password_hashes(
+        self, passwords: list[str], max_workers: int | None = None
+    ) -> list[str]:
+        # one job per worker keeps those workers busy with a single queue slot each
+        max_workers = min(max_workers or self.max_workers, self.max_workers)
+        chunk_size = max(1, -(-len(passwords) // max_workers))
+        chunks = await asyncio.gather(
+            *(
+                self.run(_hash_passwords, passwords[i : i + chunk_size])
+                for i in range(0, len(passwords), chunk_size)
+            )
+        )
+
+        return [hashed_password for chunk in chunks for hashed_password in chunk]
+
+    def get_metrics(self) -> dict:
+        return {
+            **super().get_metrics(),
+            "hash_time_seconds": self.run_time.snapshot(),
+        }
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.password_hasher_max_workers,
+    max_queue_size=settings.password_hasher_max_queue_size,
+)
 
-    @staticmethod
-    def get_password_hash(password: str) -> str:
-        return pwd_context.hash(password)
+register_collector("password_hasher", password_hasher.get_metrics)
@@ -0,0 +1,89 @@
+import io
+import time
+from typing import Dict
+
+from fastapi import HTTPException, status
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from src.core import settings
+from src.core.services.metrics import register_collector
+from src.core.services.process_pool import (
+    BoundedProcessPool,
+    ProcessExecutor,
+    process_executor,
+)
+from src.logging_config import logger
+
+AVATAR_SIZES = (64, 128, 256)
+AVATAR_FORMATS = {
+    "webp": ("WEBP", "image/webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "image/jpeg", {"quality": 85, "optimize": True}),
+}
+# a 1 MB upload can still declare huge dimensions, so decoding is capped
+MAX_IMAGE_PIXELS = 40_000_000
+
+
+def _render_avatar_variants(contents: bytes) -> tuple[Dict[str, bytes], float]:
+    start = time.perf_counter()
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+
+    with Image.open(io.BytesIO(contents)) as image:
+        # lets the JPEG decoder scale down while decoding
+        image.draft("RGB", (max(AVATAR_SIZES), max(AVATAR_SIZES)))
+        image = ImageOps.exif_transpose(image)
+        has_alpha = "A" in image.getbands() or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    variants = {}
+    for size in AVATAR_SIZES:
+        resized = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        # re-encoding from bare pixels drops EXIF, ICC and other metadata
+        resized.info = {}
+        for extension, (image_format, _, options) in AVATAR_FORMATS.items():
+            variant = resized
+            if image_format == "JPEG" and resized.mode == "RGBA":
+                variant = Image.new("RGB", resized.size, "white")
+                variant.paste(resized, mask=resized.getchannel("A"))
+
+            buffer = io.BytesIO()
+            variant.save(buffer, image_format, **options)
+            variants[f"{size}.{extension}"] = buffer.getvalue()
+
+    return variants, time.perf_counter() - start
+
+
+class ImageProcessor(BoundedProcessPool):
+    def __init__(
+        self,
+        max_workers: int | None,
+        max_queue_size: int,
+        executor: ProcessExecutor = process_executor,
+    ):
+        super().__init__("Image processor", max_workers, max_queue_size, executor)
+        self.failed = 0
+
+    async def render_avatar_variants(self, contents: bytes) -> Dict[str, bytes]:
+        try:
+            return await self.run(_render_avatar_variants, contents)
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as err:
+            self.failed += 1
+            logger.error(f"Could not process image: {err}.")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Image could not be processed.",
+            )
+
+    def get_metrics(self) -> dict:
+        return {
+            **super().get_metrics(),
+            "failed": self.failed,
+            "render_time_seconds": self.run_time.snapshot(),
+        }
+
+
+image_processor = ImageProcessor(
+    max_workers=settings.image_processor_max_workers,
+    max_queue_size=settings.image_processor_max_queue_size,
+)
+
+register_collector("image_processor", image_processor.get_metrics)
@@ -0,0 +1,95 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException, status
+
+from src.core import settings
+from src.core.services.metrics import Histogram, register_collector
+from src.logging_config import logger
+
+
+class ProcessExecutor:
+    def __init__(self, max_workers: int | None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor: ProcessPoolExecutor | None = None
+
+    def start(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            logger.info(f"Process pool started with {self.max_workers} workers.")
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        self.start()
+        return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            logger.info("Process pool stopped.")
+
+    def get_metrics(self) -> dict:
+        return {"max_workers": self.max_workers, "started": self._executor is not None}
+
+
+# every CPU-bound job runs on these workers, so they bound the processes in total
+process_executor = ProcessExecutor(max_workers=settings.process_pool_max_workers)
+
+register_collector("process_pool", process_executor.get_metrics)
+
+
+class BoundedProcessPool:
+    def __init__(
+        self,
+        name: str,
+        max_workers: int | None,
+        max_queue_size: int,
+        executor: ProcessExecutor = process_executor,
+    ):
+        self.name = name
+        # a pool may use at most this many of the shared workers at a time
+        self.max_workers = min(
+            max_workers or executor.max_workers, executor.max_workers
+        )
+        self.max_queue_size = max_queue_size
+        self.executor = executor
+        self._pending = 0
+        self.rejected = 0
+        self.wait_time = Histogram()
+        self.run_time = Histogram()
+
+    async def run(self, func, *args):
+        # func returns its result together with the time it spent in the worker
+        if self._pending >= self.max_workers + self.max_queue_size:
+            self.rejected += 1
+            logger.error(f"{self.name} queue is full.")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy. Try again later.",
+            )
+
+        self._pending += 1
+        start = time.perf_counter()
+        try:
+            result, run_time = await asyncio.get_running_loop().run_in_executor(
+                self.executor.executor, func, *args
+            )
+        finally:
+            self._pending -= 1
+
+        self.run_time.observe(run_time)
+        self.wait_time.observe(time.perf_counter() - start - run_time)
+
+        return result
+
+    def get_metrics(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue_size": self.max_queue_size,
+            "pending": self._pending,
+            "rejected": self.rejected,
+            "wait_time_seconds": self.wait_time.snapshot(),
+        }
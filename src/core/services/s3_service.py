@@ -1,17 +1,71 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import AsyncExitStack
+
 import aioboto3
+from aiobotocore.config import AioConfig
+
 from src.core import settings
+from src.logging_config import logger
 
 session = aioboto3.Session()
 
 
-@asynccontextmanager
-async def aws_client(service):
-    async with session.client(
-        service,
-        endpoint_url=settings.localstack_endpoint_url,
-        aws_access_key_id=settings.localstack_access_key_id,
-        aws_secret_access_key=settings.localstack_secret_access_key,
-        region_name="eu-central-1",
-    ) as client:
-        yield client
+class S3Client:
+    def __init__(
+        self,
+        max_pool_connections: int,
+        connect_timeout: float,
+        read_timeout: float,
+        keepalive_timeout: float,
+        max_attempts: int,
+    ):
+        self.config = AioConfig(
+            max_pool_connections=max_pool_connections,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            retries={"max_attempts": max_attempts, "mode": "standard"},
+            connector_args={"keepalive_timeout": keepalive_timeout},
+        )
+        self._client = None
+        self._exit_stack: AsyncExitStack | None = None
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        async with self._lock:
+            if self._client is not None:
+                return
+
+            exit_stack = AsyncExitStack()
+            self._client = await exit_stack.enter_async_context(
+                session.client(
+                    "s3",
+                    endpoint_url=settings.localstack_endpoint_url,
+                    aws_access_key_id=settings.localstack_access_key_id,
+                    aws_secret_access_key=settings.localstack_secret_access_key,
+                    region_name="eu-central-1",
+                    config=self.config,
+                )
+            )
+            self._exit_stack = exit_stack
+            logger.info("S3 client created.")
+
+    async def close(self):
+        if self._exit_stack is not None:
+            await self._exit_stack.aclose()
+            self._exit_stack = None
+            self._client = None
+            logger.info("S3 client closed.")
+
+    async def get_client(self):
+        if self._client is None:
+            await self.start()
+        return self._client
+
+
+s3_client = S3Client(
+    max_pool_connections=settings.s3_max_pool_connections,
+    connect_timeout=settings.s3_connect_timeout,
+    read_timeout=settings.s3_read_timeout,
+    keepalive_timeout=settings.s3_keepalive_timeout,
+    max_attempts=settings.s3_max_attempts,
+)
@@ -0,0 +1,51 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+_ABANDONED = object()
+
+
+class SingleFlight:
+    """Shares one in-flight call between concurrent callers with the same key."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        future = self._calls.get(key)
+        if future is not None:
+            self.coalesced += 1
+            succeeded, result = await asyncio.shield(future)
+            if result is _ABANDONED:
+                # the leading request was cancelled, so this one runs on its own
+                return await func()
+            if not succeeded:
+                raise result
+            return result
+
+        self.calls += 1
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.set_result((False, _ABANDONED))
+            raise
+        except Exception as err:
+            future.set_result((False, err))
+            raise
+        finally:
+            del self._calls[key]
+
+        future.set_result((True, result))
+        return result
+
+    def get_metrics(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+        }
@@ -1,12 +1,15 @@
+import secrets
 from datetime import timedelta, datetime
 
+from fastapi import Request, Security
+from fastapi.security import HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 
 from src.logging_config import logger
 from src.ports.enums import TokenType
 from src.ports.schemas.user import TokenData, TokensResult, TokenDataWithTokenType
 from src.core.exceptions import CredentialsException
-from src.core import settings
+from src.core import settings, security
 
 
 def get_token_payload(token: str) -> TokenDataWithTokenType:
@@ -22,15 +25,34 @@ def get_token_payload(token: str) -> TokenDataWithTokenType:
         raise CredentialsException("Invalid token.")
 
 
+def get_current_token_payload(
+    request: Request,
+    token: HTTPAuthorizationCredentials = Security(security),
+) -> TokenDataWithTokenType:
+    token_payload = getattr(request.state, "token_payload", None)
+
+    if token_payload is None:
+        token_payload = get_token_payload(token.credentials)
+        request.state.token_payload = token_payload
+
+    return token_payload
+
+
 def generate_token(payload: TokenDataWithTokenType, expires_delta: timedelta) -> str:
-    to_encode = payload.model_dump()
+    to_encode = payload.model_dump(exclude_none=True)
     to_encode.update({"exp": datetime.now() + expires_delta})
 
     return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
 
 
-def generate_tokens(payload: TokenData) -> TokensResult:
-    access_token_payload = payload.model_dump()
+def generate_token_id() -> str:
+    return secrets.token_urlsafe(12)
+
+
+def generate_tokens(payload: TokenData, family_id: str | None = None) -> TokensResult:
+    token_data = payload.model_dump(include=set(TokenData.model_fields))
+
+    access_token_payload = dict(token_data)
     access_token_payload.update({"token_type": TokenType.ACCESS})
     access_token = generate_token(
         payload=TokenDataWithTokenType.model_validate(access_token_payload),
@@ -39,8 +61,14 @@ def generate_tokens(payload: TokenData) -> TokensResult:
 
     refresh_token_expires = timedelta(minutes=settings.refresh_token_expire_minutes)
 
-    refresh_token_payload = payload.model_dump()
-    refresh_token_payload.update({"token_type": TokenType.REFRESH})
+    refresh_token_payload = dict(token_data)
+    refresh_token_payload.update(
+        {
+            "token_type": TokenType.REFRESH,
+            "jti": generate_token_id(),
+            "family_id": family_id or generate_token_id(),
+        }
+    )
     refresh_token = generate_token(
         payload=TokenDataWithTokenType.model_validate(refresh_token_payload),
         expires_delta=refresh_token_expires,
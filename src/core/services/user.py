@@ -1,21 +1,19 @@
-from fastapi.security import HTTPAuthorizationCredentials
-
 from src.logging_config import logger
-from src.core import security
 from src.adapters.database.database_settings import get_async_session
 from src.adapters.database.repositories.sqlalchemy_user_repository import (
     SQLAlchemyUserRepository,
 )
 from src.core.exceptions import CredentialsException
-from src.core.services.token import get_token_payload
+from src.core.services.token import get_current_token_payload
 from src.ports.schemas.user import (
     CredentialsModel,
     UserResponseModel,
     UserResponseModelWithPassword,
+    TokenDataWithTokenType,
 )
-from src.core.services.hasher import PasswordHasher
+from src.core.services.hasher import password_hasher
 
-from fastapi import Depends, HTTPException, status, Security
+from fastapi import Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -23,17 +21,9 @@ async def authenticate_user(
     credentials: CredentialsModel,
     db_session: AsyncSession,
 ) -> UserResponseModelWithPassword:
-    login_types = ["username", "email", "phone_number"]
-
-    user = None
-    for method in login_types:
-        user = await SQLAlchemyUserRepository(db_session).get_user(
-            **{method: credentials.login}
-        )
-        if user:
-            break
-        else:
-            continue
+    user = await SQLAlchemyUserRepository(db_session).get_user_by_login(
+        credentials.login
+    )
 
     if user is None:
         logger.error(f"User with login {credentials.login} not found.")
@@ -47,7 +37,7 @@ async def authenticate_user(
             status_code=status.HTTP_403_FORBIDDEN, detail="You are blocked."
         )
 
-    if not PasswordHasher.verify_password(credentials.password, user.password):
+    if not await password_hasher.verify_password(credentials.password, user.password):
         logger.error("Incorrect password.")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -58,10 +48,10 @@ async def authenticate_user(
 
 
 async def get_current_user_from_token(
-    token: HTTPAuthorizationCredentials = Security(security),
+    token_payload: TokenDataWithTokenType = Depends(get_current_token_payload),
     db_session: AsyncSession = Depends(get_async_session),
 ) -> UserResponseModel:
-    user_id = get_token_payload(token.credentials).user_id
+    user_id = token_payload.user_id
     user = await SQLAlchemyUserRepository(db_session).get_user(user_id=user_id)
 
     if user is None:
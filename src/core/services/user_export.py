@@ -0,0 +1,39 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, List
+
+from src.ports.schemas.user import UserResponseModel
+
+
+async def users_to_ndjson(partitions: AsyncIterator[List[dict]]) -> AsyncIterator[str]:
+    async for rows in partitions:
+        yield "".join(
+            UserResponseModel.model_validate(row).model_dump_json() + "\n"
+            for row in rows
+        )
+
+
+async def users_to_csv(partitions: AsyncIterator[List[dict]]) -> AsyncIterator[str]:
+    fields = list(UserResponseModel.model_fields)
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    writer.writeheader()
+
+    async for rows in partitions:
+        for row in rows:
+            user = UserResponseModel.model_validate(row).model_dump(mode="json")
+            writer.writerow(
+                {
+                    field: json.dumps(value) if isinstance(value, dict) else value
+                    for field, value in user.items()
+                }
+            )
+
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,80 @@
+import csv
+import io
+import json
+from itertools import islice
+from typing import BinaryIO, Iterable, Iterator, List, Set, Tuple
+
+from pydantic import ValidationError
+
+from src.ports.enums import UsersFileFormat
+from src.ports.schemas.user import UserImportModel, UserImportErrorModel
+
+
+def read_user_rows(
+    file: BinaryIO, file_format: UsersFileFormat
+) -> Iterator[Tuple[int, dict | str]]:
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        if file_format == UsersFileFormat.CSV:
+            reader = csv.DictReader(text)
+            for row in reader:
+                # empty CSV cells mean "not provided"
+                yield reader.line_num, {
+                    key: value for key, value in row.items() if value != ""
+                }
+        else:
+            for line, raw_row in enumerate(text, start=1):
+                if not raw_row.strip():
+                    continue
+                try:
+                    row = json.loads(raw_row)
+                except json.JSONDecodeError as err:
+                    yield line, f"Invalid JSON: {err.msg}."
+                    continue
+                yield line, row if isinstance(row, dict) else "Row must be an object."
+    finally:
+        text.detach()
+
+
+def parse_user_rows(
+    rows: Iterable[Tuple[int, dict | str]]
+) -> Tuple[List[Tuple[int, UserImportModel]], List[UserImportErrorModel]]:
+    users, errors = [], []
+
+    for line, row in rows:
+        if isinstance(row, str):
+            errors.append(UserImportErrorModel(line=line, detail=row))
+            continue
+        try:
+            users.append((line, UserImportModel.model_validate(row)))
+        except ValidationError as err:
+            detail = "; ".join(
+                f"{'.'.join(map(str, error['loc']))}: {error['msg']}"
+                for error in err.errors()
+            )
+            errors.append(UserImportErrorModel(line=line, detail=detail))
+
+    return users, errors
+
+
+def drop_duplicate_usernames(
+    users: List[Tuple[int, UserImportModel]], seen_usernames: Set[str]
+) -> Tuple[List[Tuple[int, UserImportModel]], List[UserImportErrorModel]]:
+    unique_users, errors = [], []
+
+    for line, user in users:
+        if user.username in seen_usernames:
+            errors.append(
+                UserImportErrorModel(line=line, detail="Duplicate username in file.")
+            )
+            continue
+        seen_usernames.add(user.username)
+        unique_users.append((line, user))
+
+    return unique_users, errors
+
+
+def batched(iterable: Iterable, batch_size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
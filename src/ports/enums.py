@@ -12,6 +12,17 @@ class SupportedFileTypes(StrEnum):
     JPEG: str = "image/jpeg"
 
 
+class UsersFileFormat(StrEnum):
+    NDJSON: str = "ndjson"
+    CSV: str = "csv"
+
+
 class TokenType(StrEnum):
     ACCESS: str = "access"
     REFRESH: str = "refresh"
+
+
+class RefreshTokenClaimStatus(StrEnum):
+    CLAIMED: str = "claimed"
+    REUSED: str = "reused"
+    REVOKED: str = "revoked"
@@ -3,11 +3,23 @@ from abc import ABC, abstractmethod
 
 class AwsAbstractRepository(ABC):
     @abstractmethod
-    async def add_one(self, body: bytes, key: str):
+    async def add_one(
+        self, body: bytes, key: str, content_type: str = "binary/octet-stream"
+    ):
         pass
 
     @abstractmethod
-    async def get(self, key: str):
+    async def get(self, key: str, byte_range: str | None = None):
+        pass
+
+    @abstractmethod
+    async def head(self, key: str):
+        pass
+
+    @abstractmethod
+    async def generate_presigned_post(
+        self, key: str, content_type: str, max_size: int, expires_in: int
+    ) -> dict:
         pass
 
     @abstractmethod
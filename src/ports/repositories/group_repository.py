@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from src.ports.schemas.group import GroupNameType, GroupResponseModel
 from pydantic import UUID4
-from typing import Union
+from typing import Union, Dict, Set
 
 
 class GroupRepository(ABC):
@@ -13,6 +13,16 @@ class GroupRepository(ABC):
     async def get_group(self, group_id: UUID4) -> Union[GroupResponseModel, None]:
         pass
 
+    @abstractmethod
+    async def get_or_create_groups(
+        self, group_names: Set[GroupNameType]
+    ) -> Dict[str, UUID4]:
+        pass
+
+    @abstractmethod
+    async def get_existing_group_ids(self, group_ids: Set[UUID4]) -> Set[UUID4]:
+        pass
+
     @abstractmethod
     async def delete_group(self, group_id: UUID4) -> Union[UUID4, None]:
         pass
@@ -0,0 +1,28 @@
+from abc import ABC, abstractmethod
+from typing import Union
+
+
+class ImageRepository(ABC):
+    @abstractmethod
+    async def image_exists(self, image_hash: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def acquire_image(self, image_hash: str) -> int:
+        pass
+
+    @abstractmethod
+    async def add_unreferenced_image(self, image_hash: str):
+        pass
+
+    @abstractmethod
+    async def release_image(self, image_hash: str) -> Union[int, None]:
+        pass
+
+    @abstractmethod
+    async def mark_image_deleting(self, image_hash: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def delete_image(self, image_hash: str) -> bool:
+        pass
@@ -0,0 +1,18 @@
+from abc import ABC, abstractmethod
+from datetime import timedelta
+
+from src.ports.enums import RefreshTokenClaimStatus
+
+
+class TokenBlacklistRepository(ABC):
+    @abstractmethod
+    async def claim(
+        self, token_id: str, family_id: str | None, expire_time: timedelta
+    ) -> RefreshTokenClaimStatus:
+        pass
+
+    @abstractmethod
+    async def claim_legacy(
+        self, token: str, expire_time: timedelta
+    ) -> RefreshTokenClaimStatus:
+        pass
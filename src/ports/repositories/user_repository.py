@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Union, List
+from typing import Union, List, Tuple, AsyncIterator, Set
 
 from src.ports.schemas.user import (
     UserCreateModel,
@@ -15,6 +15,10 @@ class UserRepository(ABC):
     async def create_user(self, user_data: UserCreateModel) -> UserResponseModel:
         pass
 
+    @abstractmethod
+    async def create_users(self, users: List[UserCreateModel]) -> Set[str]:
+        pass
+
     @abstractmethod
     async def get_user(
         self,
@@ -22,6 +26,16 @@ class UserRepository(ABC):
         email: str | None,
         username: str | None,
         phone_number: str | None,
+    ) -> Union[UserResponseModel, None]:
+        pass
+
+    @abstractmethod
+    async def user_exists(self, username: str, email: str, phone_number: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def get_user_by_login(
+        self, login: str
     ) -> Union[UserResponseModelWithPassword, None]:
         pass
 
@@ -37,10 +51,51 @@ class UserRepository(ABC):
     ) -> List[UserResponseModel]:
         pass
 
+    @abstractmethod
+    async def get_users_by_identifiers(
+        self,
+        user_ids: List[UUID4],
+        usernames: List[str],
+        emails: List[str],
+        filter_by_group_id: str = None,
+    ) -> List[UserResponseModel]:
+        pass
+
+    @abstractmethod
+    async def get_users_by_cursor(
+        self,
+        limit: int,
+        cursor: str,
+        filter_by_name: str,
+        filter_by_surname: str,
+        filter_by_group_id: str,
+        sort_by: str,
+        order_by: str,
+    ) -> Tuple[List[UserResponseModel], Union[str, None]]:
+        pass
+
+    @abstractmethod
+    def stream_users(
+        self,
+        filter_by_name: str,
+        filter_by_surname: str,
+        filter_by_group_id: str,
+        sort_by: str,
+        order_by: str,
+        batch_size: int,
+    ) -> AsyncIterator[List[dict]]:
+        pass
+
     @abstractmethod
     async def update_user(
         self, user_id: UUID4, user_data: UserUpdateModelWithImage
-    ) -> Union[UserResponseModel, None]:
+    ) -> Union[Tuple[UserResponseModel, Union[str, None]], None]:
+        pass
+
+    @abstractmethod
+    async def bulk_update_users(
+        self, user_ids: List[UUID4] | None, filters: dict | None, values: dict
+    ) -> List[UUID4]:
         pass
 
     @abstractmethod
@@ -50,5 +105,7 @@ class UserRepository(ABC):
         pass
 
     @abstractmethod
-    async def delete_user(self, user_id: UUID4) -> Union[UUID4, None]:
+    async def delete_user(
+        self, user_id: UUID4
+    ) -> Union[Tuple[UUID4, Union[str, None]], None]:
         pass
@@ -8,12 +8,15 @@ from pydantic import (
     UUID4,
     EmailStr,
     field_validator,
+    model_validator,
     ConfigDict,
 )
 
 from src.ports.schemas.group import GroupNameType, GroupResponseModel
-from src.ports.enums import Role, TokenType
-from typing import Optional
+from src.ports.enums import Role, TokenType, SupportedFileTypes
+from typing import Optional, List, Dict
+
+USERS_BATCH_LOOKUP_MAX_SIZE = 100
 
 
 class UserBase(BaseModel):
@@ -26,6 +29,7 @@ class UserBase(BaseModel):
 
 class UserCreateModel(UserBase):
     image: Optional[str] = None
+    image_variants: Optional[Dict[str, Dict[str, str]]] = None
     password: str
     group_id: UUID4
     role: Optional[Role] = Role.USER
@@ -67,6 +71,32 @@ class CredentialsModel(PasswordModel):
     login: str
 
 
+class UserImportModel(UserBase):
+    username: constr(pattern=r"^[a-zA-Z0-9_]+$")
+    password: constr(min_length=8)
+    group_id: Optional[UUID4] = None
+    group_name: Optional[GroupNameType] = None
+    role: Optional[Role] = Role.USER
+
+    @field_validator("password")
+    def validate_password(cls, value):
+        if not any(c.isalpha() for c in value):
+            raise ValueError("Password must contain at least one letter")
+        if not any(c.isdigit() for c in value):
+            raise ValueError("Password must contain at least one digit")
+        return value
+
+
+class UserImportErrorModel(BaseModel):
+    line: int
+    detail: str
+
+
+class UsersImportResultModel(BaseModel):
+    imported: int = 0
+    errors: List[UserImportErrorModel] = []
+
+
 class UserResponseModel(UserBase):
     model_config = ConfigDict(from_attributes=True)
 
@@ -75,6 +105,7 @@ class UserResponseModel(UserBase):
     role: Role
     created_at: datetime
     image: Optional[str] = None
+    image_variants: Optional[Dict[str, Dict[str, str]]] = None
     is_blocked: bool
     modified_at: Optional[datetime] = None
 
@@ -83,6 +114,11 @@ class UserResponseModelWithPassword(UserResponseModel):
     password: str
 
 
+class UsersCursorPageModel(BaseModel):
+    users: List[UserResponseModel]
+    next_cursor: Optional[str] = None
+
+
 class UserUpdateModelWithoutImage(BaseModel):
     email: Optional[EmailStr] = None
     username: Optional[constr(pattern=r"^[a-zA-Z0-9_]+$")] = None
@@ -97,6 +133,7 @@ class UserUpdateModelWithoutImage(BaseModel):
 
 class UserUpdateModelWithImage(UserUpdateModelWithoutImage):
     image: Optional[str] = None
+    image_variants: Optional[Dict[str, Dict[str, str]]] = None
 
 
 @dataclass
@@ -121,6 +158,83 @@ class UserUpdateMeRequestModel:
     group_id: UUID4 = Form(default=None)
 
 
+class UsersBulkFilterModel(BaseModel):
+    filter_by_name: Optional[constr(min_length=1)] = None
+    filter_by_surname: Optional[constr(min_length=1)] = None
+    filter_by_group_id: Optional[UUID4] = None
+    role: Optional[Role] = None
+    is_blocked: Optional[bool] = None
+
+    @model_validator(mode="after")
+    def validate_criteria(self):
+        # an empty filter would update every user, admins included
+        if not self.model_dump(exclude_none=True):
+            raise ValueError("At least one filter criterion must be provided")
+        return self
+
+
+class UsersBulkChangesModel(BaseModel):
+    is_blocked: Optional[bool] = None
+    role: Optional[Role] = None
+    group_id: Optional[UUID4] = None
+
+
+class UsersBulkUpdateModel(BaseModel):
+    user_ids: Optional[List[UUID4]] = None
+    filter: Optional[UsersBulkFilterModel] = None
+    changes: UsersBulkChangesModel
+    return_ids: bool = False
+
+    @model_validator(mode="after")
+    def validate_selection(self):
+        if (self.user_ids is None) == (self.filter is None):
+            raise ValueError("Exactly one of user_ids or filter must be provided")
+        if not self.changes.model_dump(exclude_none=True):
+            raise ValueError("At least one change must be provided")
+        return self
+
+
+class UsersBulkUpdateResultModel(BaseModel):
+    affected: int
+    user_ids: Optional[List[UUID4]] = None
+
+
+class UsersBatchLookupModel(BaseModel):
+    user_ids: List[UUID4] = []
+    usernames: List[str] = []
+    emails: List[EmailStr] = []
+
+    @model_validator(mode="after")
+    def validate_size(self):
+        size = len(self.user_ids) + len(self.usernames) + len(self.emails)
+        if size == 0:
+            raise ValueError("At least one user id, username or email must be provided")
+        if size > USERS_BATCH_LOOKUP_MAX_SIZE:
+            raise ValueError(
+                f"At most {USERS_BATCH_LOOKUP_MAX_SIZE} users can be looked up at once"
+            )
+        return self
+
+
+class UsersBatchLookupResultModel(BaseModel):
+    users: Dict[UUID4, UserResponseModel]
+
+
+class ImageUploadRequestModel(BaseModel):
+    content_type: SupportedFileTypes
+
+
+class ImageUploadModel(BaseModel):
+    url: str
+    fields: Dict[str, str]
+    key: str
+    expires_in: int
+
+
+class ImageUploadConfirmModel(BaseModel):
+    key: str
+
+
 class TokenData(BaseModel):
     user_id: str
     role: str
@@ -130,6 +244,8 @@ class TokenData(BaseModel):
 
 class TokenDataWithTokenType(TokenData):
     token_type: TokenType
+    jti: Optional[str] = None
+    family_id: Optional[str] = None
 
 
 class TokensResult(BaseModel):
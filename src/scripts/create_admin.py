@@ -6,7 +6,7 @@ from src.adapters.database.database_settings import async_session
 from src.adapters.database.models.groups import Group
 from src.adapters.database.models.users import User
 from src.core import settings
-from src.core.services.hasher import PasswordHasher
+from src.core.services.hasher import password_hasher
 
 
 async def create_admin_user():
@@ -25,7 +25,7 @@ async def create_admin_user():
             username=settings.admin_username,
             phone_number=settings.admin_phone_number,
             email=settings.admin_email,
-            password=PasswordHasher.get_password_hash(settings.admin_password),
+            password=await password_hasher.get_password_hash(settings.admin_password),
             group_id=new_group.id,
         )
 
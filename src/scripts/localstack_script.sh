@@ -5,3 +5,9 @@ awslocal s3api \
 create-bucket --bucket $S3_BUCKET_NAME \
 --create-bucket-configuration LocationConstraint=eu-central-1 \
 --region eu-central-1
+
+# presigned avatar uploads that are never confirmed expire after a day
+awslocal s3api \
+put-bucket-lifecycle-configuration --bucket $S3_BUCKET_NAME \
+--lifecycle-configuration '{"Rules": [{"ID": "expire-unconfirmed-uploads", "Filter": {"Prefix": "uploads/"}, "Status": "Enabled", "Expiration": {"Days": 1}}]}' \
+--region eu-central-1
@@ -25,6 +25,8 @@ from src.ports.schemas.user import (
     TokenData,
 )
 from src.adapters.database.database_settings import get_async_session
+from src.adapters.database.redis_connection import redis_connection
+from src.core.services.s3_service import s3_client
 from src.main import app
 from src.adapters.database.models.groups import Group
 from src.adapters.database.models.users import User
@@ -72,6 +74,10 @@ async def client(get_test_async_session):
     async with AsyncClient(app=app, base_url=url) as client:
         yield client
 
+    # the pools are bound to the event loop of the test that created them
+    await redis_connection.close()
+    await s3_client.close()
+
 
 @pytest.fixture()
 def user_sign_up_dict():
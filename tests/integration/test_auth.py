@@ -10,6 +10,7 @@ from src.ports.schemas.user import (
     CredentialsModel,
     TokenDataWithTokenType,
 )
+from src.adapters.database.redis_connection import redis_connection
 from tests.integration.conftest import serialize, create_user
 from src.adapters.database.repositories.sqlalchemy_user_repository import (
     SQLAlchemyUserRepository,
@@ -56,6 +57,25 @@ async def test_auth_login_success(create_user_and_login_success):
     assert response.status_code == 200
 
 
+@pytest.mark.asyncio
+async def test_auth_login_by_email_and_phone_number(
+    client: AsyncClient, user_sign_up_dict
+):
+    signup_data = SignUpModel(**user_sign_up_dict)
+    await client.post("/v1/auth/signup", data=signup_data.__dict__)
+
+    for login in (
+        user_sign_up_dict.get("email"),
+        user_sign_up_dict.get("phone_number"),
+    ):
+        login_data = CredentialsModel(
+            login=login, password=user_sign_up_dict.get("password")
+        )
+        response = await client.post("/v1/auth/login", json=login_data.model_dump())
+
+        assert response.status_code == 200
+
+
 @pytest.mark.asyncio
 async def test_auth_login_with_wrong_pass(client: AsyncClient, user_sign_up_dict):
     signup_data = SignUpModel(**user_sign_up_dict)
@@ -101,6 +121,71 @@ async def test_auth_refresh_token_endpoint(
     assert response_refresh.status_code == 200
 
 
+@pytest.mark.asyncio
+async def test_auth_refresh_token_reuse(
+    client: AsyncClient, create_user_and_login_success
+):
+    refresh_token = serialize(create_user_and_login_success.content).get(
+        "refresh_token"
+    )
+
+    await client.post("/v1/auth/refresh-token", params={"token": refresh_token})
+    response_reuse = await client.post(
+        "/v1/auth/refresh-token", params={"token": refresh_token}
+    )
+
+    assert response_reuse.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_auth_refresh_token_reuse_revokes_family(
+    client: AsyncClient, create_user_and_login_success
+):
+    refresh_token = serialize(create_user_and_login_success.content).get(
+        "refresh_token"
+    )
+
+    response_rotate = await client.post(
+        "/v1/auth/refresh-token", params={"token": refresh_token}
+    )
+    rotated_refresh_token = serialize(response_rotate.content).get("refresh_token")
+    response_replay = await client.post(
+        "/v1/auth/refresh-token", params={"token": refresh_token}
+    )
+    response_rotated = await client.post(
+        "/v1/auth/refresh-token", params={"token": rotated_refresh_token}
+    )
+
+    assert response_rotate.status_code == 200
+    assert response_replay.status_code == 400
+    assert response_rotated.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_auth_legacy_refresh_token_blacklisted_under_raw_token(
+    client: AsyncClient, get_test_async_session, user_dict_user
+):
+    user = await create_user(user_dict_user, "test", get_test_async_session)
+    # refresh tokens issued before jti was introduced
+    legacy_refresh_token = generate_token(
+        payload=TokenDataWithTokenType(
+            token_type=TokenType.REFRESH,
+            user_id=str(user.id),
+            role=user.role,
+            group_id=str(user.group_id),
+            is_blocked=user.is_blocked,
+        ),
+        expires_delta=timedelta(minutes=5),
+    )
+    await redis_connection.client.set(legacy_refresh_token, 1, ex=300)
+
+    response = await client.post(
+        "/v1/auth/refresh-token", params={"token": legacy_refresh_token}
+    )
+
+    assert response.status_code == 400
+
+
 @pytest.mark.asyncio
 async def test_auth_refresh_endpoint_using_access_token(
     client: AsyncClient, create_user_and_login_success
@@ -1,6 +1,6 @@
 import pytest
 from httpx import AsyncClient
-from tests.integration.conftest import jwt_token
+from tests.integration.conftest import jwt_token, create_user
 
 
 @pytest.mark.asyncio
@@ -79,3 +79,126 @@ async def test_get_users_for_user_role(client: AsyncClient, user_with_role_user)
     )
 
     assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_get_users_by_cursor_for_admin(
+    client: AsyncClient, user_with_role_admin, user_dict_user, get_test_async_session
+):
+    await create_user(user_dict_user, "abc1", get_test_async_session)
+    headers = {"Authorization": f"Bearer {jwt_token(user_with_role_admin)}"}
+
+    first_page = await client.get(
+        "/v1/users/cursor", params={"limit": 1, "sort_by": "email"}, headers=headers
+    )
+    next_cursor = first_page.json().get("next_cursor")
+    second_page = await client.get(
+        "/v1/users/cursor",
+        params={"limit": 1, "sort_by": "email", "cursor": next_cursor},
+        headers=headers,
+    )
+
+    first_ids = [user["id"] for user in first_page.json()["users"]]
+    second_ids = [user["id"] for user in second_page.json()["users"]]
+    assert first_page.status_code == 200 and second_page.status_code == 200
+    assert next_cursor is not None and first_ids != second_ids
+    assert second_page.json().get("next_cursor") is None
+
+
+@pytest.mark.asyncio
+async def test_get_users_by_cursor_sorted_by_role(
+    client: AsyncClient, user_with_role_admin, user_dict_user, get_test_async_session
+):
+    await create_user(user_dict_user, "abc1", get_test_async_session)
+    headers = {"Authorization": f"Bearer {jwt_token(user_with_role_admin)}"}
+
+    first_page = await client.get(
+        "/v1/users/cursor", params={"limit": 1, "sort_by": "role"}, headers=headers
+    )
+    next_cursor = first_page.json().get("next_cursor")
+    second_page = await client.get(
+        "/v1/users/cursor",
+        params={"limit": 1, "sort_by": "role", "cursor": next_cursor},
+        headers=headers,
+    )
+
+    roles = [
+        user["role"]
+        for page in (first_page, second_page)
+        for user in page.json()["users"]
+    ]
+    assert first_page.status_code == 200 and second_page.status_code == 200
+    assert roles == ["admin", "user"]
+    assert second_page.json().get("next_cursor") is None
+
+
+@pytest.mark.asyncio
+async def test_export_users_for_admin(client: AsyncClient, user_with_role_admin):
+    headers = {"Authorization": f"Bearer {jwt_token(user_with_role_admin)}"}
+
+    ndjson_response = await client.get(
+        "/v1/users/export", params={"format": "ndjson"}, headers=headers
+    )
+    csv_response = await client.get(
+        "/v1/users/export", params={"format": "csv"}, headers=headers
+    )
+
+    assert ndjson_response.status_code == 200 and csv_response.status_code == 200
+    assert len(ndjson_response.text.splitlines()) == 1
+    assert len(csv_response.text.splitlines()) == 2
+
+
+@pytest.mark.asyncio
+async def test_export_users_for_moderator(
+    client: AsyncClient, user_with_role_moderator
+):
+    response = await client.get(
+        "/v1/users/export",
+        headers={"Authorization": f"Bearer {jwt_token(user_with_role_moderator)}"},
+    )
+
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_get_users_batch_by_admin(client: AsyncClient, user_with_role_admin):
+    response = await client.post(
+        "/v1/users/batch",
+        json={
+            "user_ids": [str(user_with_role_admin.id)],
+            "usernames": [user_with_role_admin.username, "missing"],
+        },
+        headers={"Authorization": f"Bearer {jwt_token(user_with_role_admin)}"},
+    )
+
+    users = response.json()["users"]
+
+    assert response.status_code == 200
+    assert list(users) == [str(user_with_role_admin.id)]
+
+
+@pytest.mark.asyncio
+async def test_get_users_batch_scoped_to_moderator_group(
+    client: AsyncClient, moderator_and_user_with_different_groups
+):
+    user = moderator_and_user_with_different_groups.get("user_with_differ_role")
+    moderator = moderator_and_user_with_different_groups.get("user_with_role_moderator")
+    response = await client.post(
+        "/v1/users/batch",
+        json={"user_ids": [str(user.id), str(moderator.id)]},
+        headers={"Authorization": f"Bearer {jwt_token(moderator)}"},
+    )
+
+    assert response.status_code == 200
+    assert list(response.json()["users"]) == [str(moderator.id)]
+
+
+@pytest.mark.asyncio
+async def test_get_users_batch_with_role_user(client: AsyncClient, user_with_role_user):
+    response = await client.post(
+        "/v1/users/batch",
+        json={"user_ids": [str(user_with_role_user.id)]},
+        headers={"Authorization": f"Bearer {jwt_token(user_with_role_user)}"},
+    )
+
+    assert response.status_code == 403
@@ -1,6 +1,11 @@
+import uuid
+
 import pytest
+from fastapi import HTTPException, status
 from httpx import AsyncClient
-from tests.integration.conftest import jwt_token, serialize
+
+from src.core.services.hasher import password_hasher
+from tests.integration.conftest import jwt_token, serialize, create_user
 
 
 @pytest.mark.asyncio
@@ -27,6 +32,20 @@ async def test_update_me(client: AsyncClient, user_with_role_user):
     assert surname != user_with_role_user.surname
 
 
+@pytest.mark.asyncio
+async def test_update_me_invalidates_cached_user(
+    client: AsyncClient, user_with_role_user
+):
+    headers = {"Authorization": f"Bearer {jwt_token(user_with_role_user)}"}
+    new_surname = user_with_role_user.surname + "ab"
+
+    await client.get("/v1/user/me", headers=headers)
+    await client.patch("/v1/user/me", data={"surname": new_surname}, headers=headers)
+    response = await client.get("/v1/user/me", headers=headers)
+
+    assert serialize(response.content).get("surname") == new_surname
+
+
 @pytest.mark.asyncio
 async def test_update_user_by_admin(client: AsyncClient, user_with_role_admin):
     new_surname = user_with_role_admin.surname + "ab"
@@ -41,6 +60,30 @@ async def test_update_user_by_admin(client: AsyncClient, user_with_role_admin):
     assert surname != user_with_role_admin.surname
 
 
+@pytest.mark.asyncio
+async def test_update_user_with_unknown_group(
+    client: AsyncClient, user_with_role_admin
+):
+    response = await client.patch(
+        f"/v1/user/{user_with_role_admin.id}/update",
+        data={"group_id": str(uuid.uuid4())},
+        headers={"Authorization": f"Bearer {jwt_token(user_with_role_admin)}"},
+    )
+
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_update_unknown_user_by_admin(client: AsyncClient, user_with_role_admin):
+    response = await client.patch(
+        f"/v1/user/{uuid.uuid4()}/update",
+        data={"surname": "ab"},
+        headers={"Authorization": f"Bearer {jwt_token(user_with_role_admin)}"},
+    )
+
+    assert response.status_code == 404
+
+
 @pytest.mark.asyncio
 async def test_update_user_by_user(client: AsyncClient, user_with_role_user):
     response = await client.patch(
@@ -50,3 +93,157 @@ async def test_update_user_by_user(client: AsyncClient, user_with_role_user):
     )
 
     assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_import_users_by_admin(client: AsyncClient, user_with_role_admin):
+    rows = [
+        '{"email": "imported@mail.ru", "username": "imported", '
+        '"phone_number": "777777", "password": "1234567Psg", "group_name": "import"}',
+        f'{{"email": "other@mail.ru", "username": "{user_with_role_admin.username}", '
+        '"phone_number": "777778", "password": "1234567Psg", "group_name": "import"}',
+    ]
+
+    response = await client.post(
+        "/v1/users/import",
+        params={"format": "ndjson"},
+        files={"file": ("users.ndjson", "\n".join(rows).encode())},
+        headers={"Authorization": f"Bearer {jwt_token(user_with_role_admin)}"},
+    )
+
+    result = serialize(response.content)
+    assert response.status_code == 200 and result.get("imported") == 1
+    assert result.get("errors") == [{"line": 2, "detail": "User already exists."}]
+
+
+@pytest.mark.asyncio
+async def test_import_users_reports_failed_batch_as_row_errors(
+    client: AsyncClient, user_with_role_admin, monkeypatch
+):
+    async def busy_hasher(passwords, max_workers=None):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy. Try again later.",
+        )
+
+    monkeypatch.setattr(password_hasher, "get_password_hashes", busy_hasher)
+    rows = [
+        '{"email": "imported@mail.ru", "username": "imported", '
+        '"phone_number": "777777", "password": "1234567Psg", "group_name": "import"}',
+    ]
+
+    response = await client.post(
+        "/v1/users/import",
+        params={"format": "ndjson"},
+        files={"file": ("users.ndjson", "\n".join(rows).encode())},
+        headers={"Authorization": f"Bearer {jwt_token(user_with_role_admin)}"},
+    )
+
+    result = serialize(response.content)
+    assert response.status_code == 200 and result.get("imported") == 0
+    assert result.get("errors") == [
+        {"line": 1, "detail": "Server is busy. Try again later."}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_bulk_block_users_by_admin(
+    client: AsyncClient, user_with_role_admin, user_dict_user, get_test_async_session
+):
+    user = await create_user(user_dict_user, "abc1", get_test_async_session)
+
+    response = await client.patch(
+        "/v1/users/bulk",
+        json={
+            "filter": {"filter_by_group_id": str(user.group_id)},
+            "changes": {"is_blocked": True},
+            "return_ids": True,
+        },
+        headers={"Authorization": f"Bearer {jwt_token(user_with_role_admin)}"},
+    )
+
+    assert response.status_code == 200
+    assert serialize(response.content) == {"affected": 1, "user_ids": [str(user.id)]}
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_requires_selection(
+    client: AsyncClient, user_with_role_admin
+):
+    response = await client.patch(
+        "/v1/users/bulk",
+        json={"changes": {"is_blocked": True}},
+        headers={"Authorization": f"Bearer {jwt_token(user_with_role_admin)}"},
+    )
+
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("bulk_filter", [{}, {"role": None}, {"filter_by_name": ""}])
+async def test_bulk_update_rejects_empty_filter(
+    client: AsyncClient, user_with_role_admin, bulk_filter
+):
+    response = await client.patch(
+        "/v1/users/bulk",
+        json={"filter": bulk_filter, "changes": {"is_blocked": True}},
+        headers={"Authorization": f"Bearer {jwt_token(user_with_role_admin)}"},
+    )
+
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_create_image_upload(client: AsyncClient, user_with_role_user):
+    response = await client.post(
+        "/v1/user/me/image/upload",
+        json={"content_type": "image/png"},
+        headers={"Authorization": f"Bearer {jwt_token(user_with_role_user)}"},
+    )
+
+    upload = serialize(response.content)
+
+    assert response.status_code == 200
+    assert upload["key"].startswith(f"uploads/{user_with_role_user.id}/")
+    assert upload["fields"]["key"] == upload["key"]
+    assert upload["fields"]["Content-Type"] == "image/png"
+
+
+@pytest.mark.asyncio
+async def test_confirm_image_upload_of_other_user(
+    client: AsyncClient, user_with_role_user, user_with_role_admin
+):
+    response = await client.post(
+        "/v1/user/me/image/confirm",
+        json={"key": f"uploads/{user_with_role_admin.id}/{uuid.uuid4().hex}"},
+        headers={"Authorization": f"Bearer {jwt_token(user_with_role_user)}"},
+    )
+
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_confirm_missing_image_upload(client: AsyncClient, user_with_role_user):
+    response = await client.post(
+        "/v1/user/me/image/confirm",
+        json={"key": f"uploads/{user_with_role_user.id}/{uuid.uuid4().hex}"},
+        headers={"Authorization": f"Bearer {jwt_token(user_with_role_user)}"},
+    )
+
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "key_suffix", ["../other/" + "a" * 32, "A" * 32, "a" * 31, "a" * 32 + "/x"]
+)
+async def test_confirm_image_upload_with_malformed_key(
+    client: AsyncClient, user_with_role_user, key_suffix
+):
+    response = await client.post(
+        "/v1/user/me/image/confirm",
+        json={"key": f"uploads/{user_with_role_user.id}/{key_suffix}"},
+        headers={"Authorization": f"Bearer {jwt_token(user_with_role_user)}"},
+    )
+
+    assert response.status_code == 403
@@ -0,0 +1,301 @@
+import hashlib
+import io
+import uuid
+
+import pytest
+from botocore.exceptions import ClientError
+from httpx import AsyncClient
+from PIL import Image as PILImage
+from sqlalchemy import select
+
+from src.adapters.aws_repository import AwsRepository
+from src.adapters.database.rate_limiter import image_upload_limiter
+from src.adapters.database.models.images import Image
+from src.adapters.database.repositories.sqlalchemy_image_repository import (
+    SQLAlchemyImageRepository,
+)
+from src.adapters.database.repositories.sqlalchemy_user_repository import (
+    SQLAlchemyUserRepository,
+)
+from src.core.services import file_service
+from src.core.services.file_service import image_keys, image_url
+from src.ports.schemas.user import (
+    SignUpModel,
+    UserResponseModel,
+    UserUpdateModelWithImage,
+)
+from tests.integration.conftest import jwt_token, serialize
+
+
+def png_image(color: str) -> bytes:
+    buffer = io.BytesIO()
+    PILImage.new("RGB", (32, 32), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+async def objects_exist(url: str) -> bool:
+    try:
+        for key in image_keys(url):
+            await AwsRepository().head(key)
+        return True
+    except ClientError:
+        return False
+
+
+async def ref_count(db_session, contents: bytes):
+    digest = hashlib.sha256(contents).hexdigest()
+    return await db_session.scalar(select(Image.ref_count).where(Image.hash == digest))
+
+
+def auth_headers(user: dict) -> dict:
+    token = jwt_token(UserResponseModel.model_validate(user))
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def signup_with_image(client: AsyncClient, user_sign_up_dict: dict, contents):
+    return await client.post(
+        "/v1/auth/signup",
+        data=SignUpModel(**user_sign_up_dict).__dict__,
+        files={"image_file": ("avatar.png", contents, "image/png")},
+    )
+
+
+@pytest.fixture()
+def uploads(monkeypatch):
+    calls = []
+    upload_image = file_service.upload_image
+
+    async def counting_upload_image(image):
+        calls.append(image.digest)
+        return await upload_image(image)
+
+    monkeypatch.setattr(file_service, "upload_image", counting_upload_image)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_identical_images_are_uploaded_once(
+    client: AsyncClient,
+    user_sign_up_dict,
+    user_sign_up_dict_2,
+    get_test_async_session,
+    uploads,
+):
+    contents = png_image("red")
+
+    first = serialize(
+        (await signup_with_image(client, user_sign_up_dict, contents)).content
+    )
+    second = serialize(
+        (await signup_with_image(client, user_sign_up_dict_2, contents)).content
+    )
+
+    assert first["image"] == second["image"]
+    assert len(uploads) == 1
+    assert await ref_count(get_test_async_session, contents) == 2
+    assert await objects_exist(first["image"])
+
+
+@pytest.mark.asyncio
+async def test_shared_image_is_deleted_with_last_reference(
+    client: AsyncClient, user_sign_up_dict, user_sign_up_dict_2, get_test_async_session
+):
+    contents = png_image("green")
+    first = serialize(
+        (await signup_with_image(client, user_sign_up_dict, contents)).content
+    )
+    second = serialize(
+        (await signup_with_image(client, user_sign_up_dict_2, contents)).content
+    )
+
+    await client.delete("/v1/user/me", headers=auth_headers(first))
+
+    assert await ref_count(get_test_async_session, contents) == 1
+    assert await objects_exist(first["image"])
+
+    await client.delete("/v1/user/me", headers=auth_headers(second))
+
+    assert await ref_count(get_test_async_session, contents) is None
+    assert not await objects_exist(first["image"])
+
+
+@pytest.mark.asyncio
+async def test_update_releases_replaced_image(
+    client: AsyncClient, user_sign_up_dict, get_test_async_session
+):
+    old_contents, new_contents = png_image("blue"), png_image("yellow")
+    user = serialize(
+        (await signup_with_image(client, user_sign_up_dict, old_contents)).content
+    )
+
+    response = await client.patch(
+        "/v1/user/me",
+        files={"image_file": ("avatar.png", new_contents, "image/png")},
+        headers=auth_headers(user),
+    )
+    updated_user = serialize(response.content)
+
+    assert response.status_code == 200
+    assert await ref_count(get_test_async_session, old_contents) is None
+    assert not await objects_exist(user["image"])
+    assert await ref_count(get_test_async_session, new_contents) == 1
+    assert await objects_exist(updated_user["image"])
+
+
+@pytest.mark.asyncio
+async def test_update_deletes_legacy_image(
+    client: AsyncClient, user_with_role_user, get_test_async_session
+):
+    legacy_key = f"legacy-{uuid.uuid4().hex}"
+    await AwsRepository().add_one(png_image("white"), legacy_key, "image/png")
+    await SQLAlchemyUserRepository(get_test_async_session).update_user(
+        user_with_role_user.id, UserUpdateModelWithImage(image=image_url(legacy_key))
+    )
+
+    response = await client.patch(
+        "/v1/user/me",
+        files={"image_file": ("avatar.png", png_image("black"), "image/png")},
+        headers={"Authorization": f"Bearer {jwt_token(user_with_role_user)}"},
+    )
+
+    assert response.status_code == 200
+    assert not await objects_exist(image_url(legacy_key))
+
+
+@pytest.mark.asyncio
+async def test_failed_signup_removes_uploaded_image(
+    client: AsyncClient, user_sign_up_dict, get_test_async_session
+):
+    contents = png_image("purple")
+    user_sign_up_dict.update(group_id=str(uuid.uuid4()), group_name=None)
+
+    response = await signup_with_image(client, user_sign_up_dict, contents)
+
+    digest = hashlib.sha256(contents).hexdigest()
+    assert response.status_code == 404
+    assert await ref_count(get_test_async_session, contents) is None
+    assert not await objects_exist(file_service.stored_image(digest).url)
+
+
+@pytest.mark.asyncio
+async def test_objects_deleted_meanwhile_are_uploaded_again(
+    client: AsyncClient,
+    user_sign_up_dict,
+    user_sign_up_dict_2,
+    get_test_async_session,
+    uploads,
+):
+    contents = png_image("cyan")
+    first = serialize(
+        (await signup_with_image(client, user_sign_up_dict, contents)).content
+    )
+    # a deletion that started before the second reference removes the objects
+    await file_service.delete_old_image(first["image"])
+
+    second = serialize(
+        (await signup_with_image(client, user_sign_up_dict_2, contents)).content
+    )
+
+    assert len(uploads) == 2
+    assert await ref_count(get_test_async_session, contents) == 2
+    assert await objects_exist(second["image"])
+
+
+@pytest.mark.asyncio
+async def test_image_acquired_during_deletion_is_kept(get_test_async_session):
+    digest = hashlib.sha256(png_image("gray")).hexdigest()
+    image_repository = SQLAlchemyImageRepository(get_test_async_session)
+    await image_repository.add_unreferenced_image(digest)
+
+    assert await image_repository.mark_image_deleting(digest)
+    assert not await image_repository.image_exists(digest)
+
+    await image_repository.acquire_image(digest)
+
+    assert not await image_repository.delete_image(digest)
+    assert await image_repository.image_exists(digest)
+
+
+async def upload_to_presigned_post(client: AsyncClient, user, contents: bytes) -> str:
+    response = await client.post(
+        "/v1/user/me/image/upload",
+        json={"content_type": "image/png"},
+        headers={"Authorization": f"Bearer {jwt_token(user)}"},
+    )
+    upload = serialize(response.content)
+
+    # the bytes go straight to S3, not through the app
+    async with AsyncClient() as s3_client:
+        s3_response = await s3_client.post(
+            upload["url"],
+            data=upload["fields"],
+            files={"file": ("avatar.png", contents, "image/png")},
+        )
+    assert s3_response.status_code in (200, 204)
+
+    return upload["key"]
+
+
+async def staged_object_exists(key: str) -> bool:
+    try:
+        await AwsRepository().head(key)
+        return True
+    except ClientError:
+        return False
+
+
+@pytest.mark.asyncio
+async def test_confirm_presigned_image_upload(
+    client: AsyncClient, user_with_role_user, get_test_async_session
+):
+    contents = png_image("orange")
+    key = await upload_to_presigned_post(client, user_with_role_user, contents)
+
+    response = await client.post(
+        "/v1/user/me/image/confirm",
+        json={"key": key},
+        headers={"Authorization": f"Bearer {jwt_token(user_with_role_user)}"},
+    )
+    user = serialize(response.content)
+
+    assert response.status_code == 200
+    assert set(user["image_variants"]) == {"webp", "jpeg"}
+    assert await objects_exist(user["image"])
+    assert await ref_count(get_test_async_session, contents) == 1
+    assert not await staged_object_exists(key)
+
+
+@pytest.mark.asyncio
+async def test_confirm_presigned_upload_with_spoofed_type(
+    client: AsyncClient, user_with_role_user
+):
+    key = await upload_to_presigned_post(
+        client, user_with_role_user, b"<svg xmlns='http://www.w3.org/2000/svg'/>"
+    )
+
+    response = await client.post(
+        "/v1/user/me/image/confirm",
+        json={"key": key},
+        headers={"Authorization": f"Bearer {jwt_token(user_with_role_user)}"},
+    )
+
+    assert response.status_code == 400
+    assert not await staged_object_exists(key)
+
+
+@pytest.mark.asyncio
+async def test_image_upload_requests_are_rate_limited(
+    client: AsyncClient, user_with_role_user, monkeypatch
+):
+    monkeypatch.setattr(image_upload_limiter, "limit", 1)
+    headers = {"Authorization": f"Bearer {jwt_token(user_with_role_user)}"}
+
+    first = await client.post(
+        "/v1/user/me/image/upload", json={"content_type": "image/png"}, headers=headers
+    )
+    second = await client.post(
+        "/v1/user/me/image/upload", json={"content_type": "image/png"}, headers=headers
+    )
+
+    assert first.status_code == 200
+    assert second.status_code == 429
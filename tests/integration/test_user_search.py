@@ -0,0 +1,46 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.adapters.database.models.users import User
+from src.adapters.database.repositories.sqlalchemy_user_repository import (
+    SQLAlchemyUserRepository,
+)
+
+
+async def explain(db_session: AsyncSession, query) -> str:
+    compiled = query.compile(dialect=db_session.bind.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+
+    connection = await db_session.connection()
+    # the test table is tiny, so make the planner prove the index is usable
+    await connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    plan = await connection.exec_driver_sql(f"EXPLAIN {compiled}", params)
+
+    return "\n".join(row[0] for row in plan)
+
+
+@pytest.mark.asyncio
+async def test_filter_by_name_uses_trigram_index(
+    get_test_async_session, user_with_role_admin
+):
+    query = SQLAlchemyUserRepository._filter_users(select(User), filter_by_name="xampl")
+
+    plan = await explain(get_test_async_session, query)
+
+    assert "ix_users_group_id_name_trgm" in plan
+
+
+@pytest.mark.asyncio
+async def test_moderator_filter_by_surname_uses_trigram_index(
+    get_test_async_session, user_with_role_moderator
+):
+    query = SQLAlchemyUserRepository._filter_users(
+        select(User),
+        filter_by_surname="xampl",
+        filter_by_group_id=str(user_with_role_moderator.group_id),
+    )
+
+    plan = await explain(get_test_async_session, query)
+
+    assert "ix_users_group_id_surname_trgm" in plan
@@ -0,0 +1,31 @@
+from src.adapters.database.taken_identifiers import TakenIdentifiers
+from src.core.services.bloom_filter import BloomFilter
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+
+    for i in range(1000):
+        bloom_filter.add(f"username:user{i}")
+
+    assert all(f"username:user{i}" in bloom_filter for i in range(1000))
+
+
+def test_bloom_filter_false_positive_rate():
+    bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+
+    for i in range(1000):
+        bloom_filter.add(f"username:user{i}")
+
+    false_positives = sum(f"email:user{i}" in bloom_filter for i in range(10000))
+
+    assert false_positives < 300
+
+
+def test_taken_identifiers_capacity_covers_every_identifier_with_headroom():
+    identifiers = TakenIdentifiers(
+        enabled=True, capacity=1000, error_rate=0.01, headroom=1.5
+    )
+
+    assert identifiers.filter_capacity(100) == 1000
+    assert identifiers.filter_capacity(1_000_000) == 4_500_000
@@ -0,0 +1,23 @@
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.adapters.database import database_settings
+from src.adapters.database.models.groups import Group
+
+
+def test_reads_stick_to_primary_after_write(monkeypatch):
+    replica_engine = create_async_engine("postgresql+asyncpg://u:p@replica/d")
+    monkeypatch.setattr(database_settings, "replica_engines", [replica_engine])
+    session = database_settings.async_session().sync_session
+    read_query = select(Group).execution_options(use_replica=True)
+
+    assert session.get_bind(clause=select(Group)) is (
+        database_settings.async_engine.sync_engine
+    )
+    assert session.get_bind(clause=read_query) is replica_engine.sync_engine
+
+    session.get_bind(clause=update(Group))
+
+    assert session.get_bind(clause=read_query) is (
+        database_settings.async_engine.sync_engine
+    )
@@ -0,0 +1,48 @@
+import uuid
+from datetime import datetime
+
+import pytest
+
+from src.adapters.database.group_cache import GroupCache
+from src.ports.schemas.group import GroupResponseModel
+
+
+def make_group(name: str) -> GroupResponseModel:
+    return GroupResponseModel(id=uuid.uuid4(), name=name, created_at=datetime.now())
+
+
+@pytest.fixture
+def cache():
+    return GroupCache(enabled=True, max_size=2, ttl_seconds=60, pubsub_enabled=False)
+
+
+def test_group_cache_evicts_least_recently_used(cache):
+    first, second, third = make_group("a"), make_group("b"), make_group("c")
+
+    cache.set(first)
+    cache.set(second)
+    cache.get(first.id)
+    cache.set(third)
+
+    assert cache.get(first.id) == first
+    assert cache.get(second.id) is None
+    assert cache.get_metrics()["evictions"] == 1
+
+
+def test_group_cache_expires_entries(cache):
+    group = make_group("a")
+    cache.ttl_seconds = -1
+
+    cache.set(group)
+
+    assert cache.get(group.id) is None
+
+
+@pytest.mark.asyncio
+async def test_group_cache_invalidate(cache):
+    group = make_group("a")
+    cache.set(group)
+
+    await cache.invalidate(group.id)
+
+    assert cache.get(group.id) is None
@@ -0,0 +1,67 @@
+import pytest
+from fastapi import HTTPException, status
+
+from src.core.services.hasher import PasswordHasher
+from src.core.services.image_processor import ImageProcessor
+from src.core.services.process_pool import ProcessExecutor
+
+
+@pytest.fixture
+def hasher():
+    executor = ProcessExecutor(max_workers=1)
+    yield PasswordHasher(max_workers=1, max_queue_size=0, executor=executor)
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_password(hasher):
+    hashed_password = await hasher.get_password_hash("1234567Psg")
+
+    assert await hasher.verify_password("1234567Psg", hashed_password) is True
+    assert await hasher.verify_password("1234567Psh", hashed_password) is False
+    assert hasher.get_metrics()["hash_time_seconds"]["count"] == 3
+
+
+@pytest.mark.asyncio
+async def test_get_password_hashes_keeps_order(hasher):
+    passwords = ["1234567Psg", "7654321Psg", "1111111Psg"]
+
+    hashed_passwords = await hasher.get_password_hashes(passwords)
+
+    for password, hashed_password in zip(passwords, hashed_passwords):
+        assert await hasher.verify_password(password, hashed_password) is True
+
+
+@pytest.mark.asyncio
+async def test_hasher_rejects_when_queue_is_full(hasher):
+    hasher._pending = hasher.max_workers
+
+    with pytest.raises(HTTPException) as exc_info:
+        await hasher.get_password_hash("1234567Psg")
+
+    assert exc_info.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+
+@pytest.mark.asyncio
+async def test_get_password_hashes_uses_at_most_max_workers():
+    executor = ProcessExecutor(max_workers=4)
+    hasher = PasswordHasher(max_workers=4, max_queue_size=0, executor=executor)
+    passwords = ["1234567Psg"] * 4
+    try:
+        await hasher.get_password_hashes(passwords, max_workers=2)
+    finally:
+        executor.shutdown()
+
+    assert hasher.get_metrics()["hash_time_seconds"]["count"] == 2
+
+
+def test_pools_share_the_process_executor_workers():
+    executor = ProcessExecutor(max_workers=2)
+
+    hasher = PasswordHasher(max_workers=8, max_queue_size=0, executor=executor)
+    image_processor = ImageProcessor(
+        max_workers=None, max_queue_size=0, executor=executor
+    )
+
+    assert hasher.executor is image_processor.executor
+    assert hasher.max_workers == image_processor.max_workers == 2
@@ -0,0 +1,45 @@
+import io
+
+import pytest
+from fastapi import HTTPException, status
+from PIL import Image
+
+from src.core.services.image_processor import (
+    AVATAR_FORMATS,
+    AVATAR_SIZES,
+    ImageProcessor,
+    _render_avatar_variants,
+)
+from src.core.services.process_pool import ProcessExecutor
+
+
+def png_with_alpha() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGBA", (640, 480), (255, 0, 0, 128)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_render_avatar_variants_produces_every_size_and_format():
+    variants, _ = _render_avatar_variants(png_with_alpha())
+
+    assert set(variants) == {
+        f"{size}.{extension}" for size in AVATAR_SIZES for extension in AVATAR_FORMATS
+    }
+    for filename, body in variants.items():
+        size, extension = filename.split(".")
+        with Image.open(io.BytesIO(body)) as variant:
+            assert variant.size == (int(size), int(size))
+            assert variant.format == AVATAR_FORMATS[extension][0]
+            assert "exif" not in variant.info
+
+
+@pytest.mark.asyncio
+async def test_image_processor_rejects_undecodable_image():
+    executor = ProcessExecutor(max_workers=1)
+    image_processor = ImageProcessor(max_workers=1, max_queue_size=0, executor=executor)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await image_processor.render_avatar_variants(b"\x89PNG\r\n\x1a\nbroken")
+    executor.shutdown()
+
+    assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,119 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException, status
+from sqlalchemy.dialects import postgresql
+
+from src.adapters.database.models.users import User
+from src.adapters.database.pagination import (
+    encode_cursor,
+    decode_cursor,
+    keyset_seeks,
+)
+from src.ports.enums import Role
+
+
+def test_cursor_round_trip_with_datetime():
+    created_at = datetime(2024, 1, 15, 22, 19, 11)
+    user_id = uuid.uuid4()
+
+    cursor = encode_cursor("created_at", "desc", created_at, user_id)
+
+    assert decode_cursor(cursor, "created_at", "desc", User.created_at) == (
+        created_at,
+        str(user_id),
+    )
+
+
+def test_cursor_for_different_sort_order_is_rejected():
+    cursor = encode_cursor("name", "asc", "Example", uuid.uuid4())
+
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor, "name", "desc", User.name)
+
+    assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_malformed_cursor_is_rejected():
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor("not-a-cursor", None, "asc", None)
+
+    assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def compile_seeks(seeks) -> list[str]:
+    return [
+        str(condition.compile(dialect=postgresql.dialect())) for condition, _ in seeks
+    ]
+
+
+def test_keyset_seeks_continue_with_null_values_after_last_value():
+    seeks = keyset_seeks(User.name, User.id, "asc", "Example", str(uuid.uuid4()))
+
+    compiled = compile_seeks(seeks)
+
+    assert compiled[0].startswith("(users.name, users.id) > (")
+    assert compiled[1] == "users.name IS NULL"
+
+
+def test_keyset_seeks_within_null_values_use_id_only():
+    seeks = keyset_seeks(User.name, User.id, "desc", None, str(uuid.uuid4()))
+
+    compiled = compile_seeks(seeks)
+
+    assert len(compiled) == 1
+    assert compiled[0].startswith("users.name IS NULL AND users.id < ")
+
+
+def test_keyset_seeks_skip_null_seek_for_non_nullable_column():
+    seeks = keyset_seeks(User.email, User.id, "asc")
+
+    assert compile_seeks(seeks) == ["users.email IS NOT NULL"]
+
+
+def test_cursor_round_trip_with_enum_column():
+    user_id = uuid.uuid4()
+
+    cursor = encode_cursor("role", "asc", Role.ADMIN, user_id)
+
+    assert decode_cursor(cursor, "role", "asc", User.role) == (
+        Role.ADMIN,
+        str(user_id),
+    )
+
+
+def test_cursor_round_trip_with_uuid_column():
+    group_id = uuid.uuid4()
+    user_id = uuid.uuid4()
+
+    cursor = encode_cursor("group_id", "asc", group_id, user_id)
+
+    assert decode_cursor(cursor, "group_id", "asc", User.group_id) == (
+        group_id,
+        str(user_id),
+    )
+
+
+@pytest.mark.parametrize(
+    "sort_by, column, value, last_id",
+    [
+        ("name", User.name, "Example", "not-a-uuid"),
+        ("name", User.name, 42, str(uuid.uuid4())),
+        ("group_id", User.group_id, "not-a-uuid", str(uuid.uuid4())),
+        ("is_blocked", User.is_blocked, "yes", str(uuid.uuid4())),
+        ("role", User.role, "superuser", str(uuid.uuid4())),
+        ("created_at", User.created_at, 1700000000, str(uuid.uuid4())),
+        (None, None, "Example", str(uuid.uuid4())),
+    ],
+)
+def test_tampered_cursor_is_rejected(sort_by, column, value, last_id):
+    data = {"sort_by": sort_by, "order_by": "asc", "value": value, "id": last_id}
+    cursor = base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor, sort_by, "asc", column)
+
+    assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,43 @@
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.util import greenlet_spawn
+
+from src.adapters.database.pool import InstrumentedQueuePool
+
+
+def test_pool_reports_checkouts():
+    pool = InstrumentedQueuePool(MagicMock, pool_size=1, max_overflow=0)
+
+    connection = pool.connect()
+    checked_out_metrics = pool.get_metrics()
+    connection.close()
+    metrics = pool.get_metrics()
+
+    assert checked_out_metrics["checked_out"] == 1
+    assert metrics["checked_out"] == 0 and metrics["idle"] == 1
+    assert metrics["waiting"] == 0
+    assert metrics["checkout_time_seconds"]["count"] == 1
+    assert metrics["hold_time_seconds"]["count"] == 1
+    assert metrics["waits"] == 0
+
+
+def check_out_twice(pool: InstrumentedQueuePool):
+    connection = pool.connect()
+    with pytest.raises(TimeoutError):
+        pool.connect()
+    connection.close()
+    pool.connect().close()
+
+
+@pytest.mark.asyncio
+async def test_pool_counts_only_blocked_checkouts():
+    pool = InstrumentedQueuePool(MagicMock, pool_size=1, max_overflow=0, timeout=0.01)
+
+    # the async pool only waits inside a greenlet, as it does under asyncio
+    await greenlet_spawn(check_out_twice, pool)
+    metrics = pool.get_metrics()
+
+    assert metrics["waits"] == 1 and metrics["waiting"] == 0
+    assert metrics["timeouts"] == 1
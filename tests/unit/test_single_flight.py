@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from src.core.services.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_result():
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def lookup():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"id": 1}
+
+    results = await asyncio.gather(*(single_flight.do("1", lookup) for _ in range(5)))
+
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    assert single_flight.get_metrics() == {"in_flight": 0, "calls": 1, "coalesced": 4}
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_with_waiting_callers():
+    single_flight = SingleFlight()
+
+    async def lookup():
+        await asyncio.sleep(0.01)
+        raise ValueError("lookup failed")
+
+    results = await asyncio.gather(
+        single_flight.do("1", lookup),
+        single_flight.do("1", lookup),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert single_flight.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_waiting_caller_runs_lookup_when_leader_is_cancelled():
+    single_flight = SingleFlight()
+
+    async def lookup():
+        await asyncio.sleep(0.01)
+        return 1
+
+    leader = asyncio.create_task(single_flight.do("1", lookup))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(single_flight.do("1", lookup))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == 1
@@ -1,13 +1,19 @@
 import uuid
-from fastapi import status
+from fastapi import status, Request
+from fastapi.security import HTTPAuthorizationCredentials
 import pytest
 from datetime import timedelta, datetime
 from jose import jwt
 from src.core.exceptions import CredentialsException
 from src.ports.enums import TokenType
-from src.ports.schemas.user import TokenDataWithTokenType
+from src.ports.schemas.user import TokenDataWithTokenType, TokenData
 from src.core import settings
-from src.core.services.token import get_token_payload, generate_token
+from src.core.services.token import (
+    get_token_payload,
+    generate_token,
+    get_current_token_payload,
+    generate_tokens,
+)
 
 
 @pytest.fixture
@@ -75,3 +81,42 @@ def test_generate_token(mock_settings):
         result, settings.secret_key, algorithms=[settings.algorithm]
     )
     assert decoded_payload["user_id"] == test_user_uuid
+
+
+def test_get_current_token_payload_decodes_once_per_request(mocker):
+    payload = TokenDataWithTokenType(
+        user_id=str(uuid.uuid4()),
+        role="user",
+        group_id=str(uuid.uuid4()),
+        is_blocked=False,
+        token_type=TokenType.ACCESS,
+    )
+    token = HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=generate_token(payload, timedelta(minutes=1))
+    )
+    request = Request(scope={"type": "http"})
+    decode = mocker.spy(jwt, "decode")
+
+    first = get_current_token_payload(request, token)
+    second = get_current_token_payload(request, token)
+
+    assert first == payload and second is first
+    assert decode.call_count == 1
+
+
+def test_generate_tokens_rotates_jti_within_family():
+    token_data = TokenData(
+        user_id=str(uuid.uuid4()),
+        role="user",
+        group_id=str(uuid.uuid4()),
+        is_blocked=False,
+    )
+
+    first = get_token_payload(generate_tokens(token_data).refresh_token)
+    rotated = get_token_payload(
+        generate_tokens(first, family_id=first.family_id).refresh_token
+    )
+    access = get_token_payload(generate_tokens(first).access_token)
+
+    assert rotated.family_id == first.family_id and rotated.jti != first.jti
+    assert access.jti is None and access.family_id is None
@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+
+from src.core.services.user_export import users_to_csv, users_to_ndjson
+from src.ports.enums import Role
+
+
+def user_row(username: str) -> dict:
+    return {
+        "email": f"{username}@mail.ru",
+        "username": username,
+        "phone_number": "12345",
+        "name": "Example",
+        "surname": None,
+        "id": uuid.uuid4(),
+        "group_id": uuid.uuid4(),
+        "role": Role.USER,
+        "created_at": datetime(2024, 1, 15),
+        "image": None,
+        "is_blocked": False,
+        "modified_at": None,
+    }
+
+
+async def partitions():
+    yield [user_row("first"), user_row("second")]
+    yield [user_row("third")]
+
+
+async def collect(chunks) -> str:
+    return "".join([chunk async for chunk in chunks])
+
+
+@pytest.mark.asyncio
+async def test_users_to_ndjson():
+    lines = (await collect(users_to_ndjson(partitions()))).splitlines()
+
+    assert [json.loads(line)["username"] for line in lines] == [
+        "first",
+        "second",
+        "third",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_users_to_csv():
+    rows = list(csv.DictReader(io.StringIO(await collect(users_to_csv(partitions())))))
+
+    assert [row["username"] for row in rows] == ["first", "second", "third"]
+    assert rows[0]["surname"] == ""
+
+
+@pytest.mark.asyncio
+async def test_users_to_csv_without_users_has_header():
+    async def no_partitions():
+        return
+        yield
+
+    content = await collect(users_to_csv(no_partitions()))
+
+    assert content.startswith("email,username,phone_number")
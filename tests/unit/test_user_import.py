@@ -0,0 +1,55 @@
+import io
+
+from src.core.services.user_import import (
+    read_user_rows,
+    parse_user_rows,
+    drop_duplicate_usernames,
+    batched,
+)
+from src.ports.enums import UsersFileFormat
+
+VALID_USER = (
+    '{"email": "example@mail.ru", "username": "example", "phone_number": "12345", '
+    '"password": "1234567Psg", "group_name": "example"}'
+)
+
+
+def test_read_and_parse_ndjson_rows():
+    file = io.BytesIO(
+        "\n".join([VALID_USER, "", "{not json", '{"username": "no_email"}']).encode()
+    )
+
+    users, errors = parse_user_rows(read_user_rows(file, UsersFileFormat.NDJSON))
+
+    assert [(line, user.username) for line, user in users] == [(1, "example")]
+    assert [error.line for error in errors] == [3, 4]
+    assert "email" in errors[1].detail
+
+
+def test_read_and_parse_csv_rows():
+    file = io.BytesIO(
+        b"email,username,phone_number,password,group_name,name\n"
+        b"example@mail.ru,example,12345,1234567Psg,example,\n"
+        b"test@mail.ru,test,123451,weak,example,Test\n"
+    )
+
+    users, errors = parse_user_rows(read_user_rows(file, UsersFileFormat.CSV))
+
+    assert len(users) == 1 and users[0][1].name is None
+    assert errors[0].line == 3 and "password" in errors[0].detail
+
+
+def test_batched():
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_duplicate_usernames_are_reported():
+    file = io.BytesIO("\n".join([VALID_USER, VALID_USER, VALID_USER]).encode())
+    users, _ = parse_user_rows(read_user_rows(file, UsersFileFormat.NDJSON))
+    seen_usernames = set()
+
+    first_batch, first_errors = drop_duplicate_usernames(users[:2], seen_usernames)
+    second_batch, second_errors = drop_duplicate_usernames(users[2:], seen_usernames)
+
+    assert [line for line, _ in first_batch] == [1] and second_batch == []
+    assert [error.line for error in first_errors + second_errors] == [2, 3]
@@ -1,15 +1,23 @@
+import hashlib
+
 import pytest
 from fastapi import UploadFile, HTTPException, status
 from starlette.datastructures import Headers
 
 from src.ports.enums import SupportedFileTypes
-from src.core.services.file_service import validate_file
+from src.core.services.file_service import (
+    image_digest,
+    image_keys,
+    is_valid_upload,
+    stored_image,
+    validate_file,
+)
 
 
 @pytest.fixture
 def upload_valid_file(tmp_path):
     file_path = tmp_path / "test.png"
-    file_path.write_bytes(b"some_binary_data")
+    file_path.write_bytes(b"\x89PNG\r\n\x1a\nsome_binary_data")
 
     return UploadFile(
         filename="test.png",
@@ -21,7 +29,7 @@ def upload_valid_file(tmp_path):
 @pytest.fixture
 def upload_invalid_size_file(tmp_path):
     file_path = tmp_path / "test.png"
-    file_path.write_bytes(b"x" * (1024 * 1024 + 1))
+    file_path.write_bytes(b"\x89PNG\r\n\x1a\n" + b"x" * (1024 * 1024))
 
     return UploadFile(
         filename="test.png",
@@ -42,11 +50,25 @@ def upload_invalid_type_file(tmp_path):
     )
 
 
+@pytest.fixture
+def upload_spoofed_type_file(tmp_path):
+    file_path = tmp_path / "test.png"
+    file_path.write_bytes(b"some_binary_data")
+
+    return UploadFile(
+        filename="test.png",
+        file=file_path.open("rb"),
+        headers=Headers({"content-type": SupportedFileTypes.PNG}),
+    )
+
+
 @pytest.mark.asyncio
 async def test_validate_file_success(upload_valid_file):
     result = await validate_file(upload_valid_file)
 
-    assert result is True
+    assert result.content_type == SupportedFileTypes.PNG
+    assert result.contents == b"\x89PNG\r\n\x1a\nsome_binary_data"
+    assert result.digest == hashlib.sha256(result.contents).hexdigest()
 
 
 @pytest.mark.asyncio
@@ -63,3 +85,38 @@ async def test_validate_file_invalid_type(upload_invalid_type_file):
         await validate_file(upload_invalid_type_file)
 
     assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_validate_file_spoofed_type(upload_spoofed_type_file):
+    with pytest.raises(HTTPException) as exc_info:
+        await validate_file(upload_spoofed_type_file)
+
+    assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_stored_image_keys_share_digest():
+    digest = hashlib.sha256(b"image").hexdigest()
+    image = stored_image(digest)
+
+    assert image_digest(image.url) == digest
+    assert len(image_keys(image.url)) == 6
+    assert all(key.startswith(f"{digest}/") for key in image_keys(image.url))
+
+
+def test_legacy_image_has_no_digest():
+    assert image_digest("http://localhost:4566/bucket/username") is None
+    assert image_digest("http://localhost:4566/bucket/username/256.jpeg") is None
+
+
+@pytest.mark.parametrize(
+    "head, size, content_type, expected",
+    [
+        (b"\x89PNG\r\n\x1a\n", 100, SupportedFileTypes.PNG, True),
+        (b"\x89PNG\r\n\x1a\n", 100, SupportedFileTypes.JPEG, False),
+        (b"<svg></svg>", 100, SupportedFileTypes.PNG, False),
+        (b"\x89PNG\r\n\x1a\n", 1024 * 1024, SupportedFileTypes.PNG, False),
+    ],
+)
+def test_is_valid_upload(head, size, content_type, expected):
+    assert is_valid_upload(head, size, content_type) is expected